@@ -1,17 +1,41 @@
-from typing import TypeVar, Callable, Any
+from itertools import chain
+from typing import TypeVar, Callable, Iterator, Any, TextIO
 
+from PrettyPrint.Utils.Budget import Budget
+from PrettyPrint.Utils.GcPause import GcPause
+from PrettyPrint.Utils.Layout import Layout
 from PrettyPrint.Utils.NodeFormatter import NodeFormatter
 from PrettyPrint.Utils.Orientation import Orientation
-from PrettyPrint.PrintTree.HorizontalTree import add_parent as add_parent_left
-from PrettyPrint.PrintTree.TreeFormatter import TreeFormatter
-from PrettyPrint.PrintTree.VerticalTree import add_parent as add_parent_top
+from PrettyPrint.Utils.RenderStats import RenderStats
+from PrettyPrint.Utils.Streaming import strip_trailing_lines, write_lines
+from PrettyPrint.Utils.StyleAwareUtils import ASCII_TABLE
+from PrettyPrint.PrintTree.TreeFormatter import TreeFormatter, MoreChildren
 
 T = TypeVar("T")
+_MISSING = object()
+PHASES = {
+    'get_node_val': 'get_val',
+    'get_next': 'get_next',
+    'get_prev': 'get_prev',
+    'start_message': 'start_message',
+    'cycle_marker': 'cycle_marker',
+    'add_styles': 'styles',
+    'make_box': 'measure',
+    'walk_chain': 'walk',
+    'linked_list_vertical_join': 'join',
+    'linked_list_horizontal_join': 'join',
+}
+# by whether get_prev of the next node points back (get_next always points forward)
+VERTICAL_ARROWS = {True: '↕', False: '↓'}
+HORIZONTAL_ARROWS = {True: '↔', False: '→'}
+ARROW_BOXES = {}
 
 
 class LinkedListFormatter:
     Vertical = Orientation.Vertical
     Horizontal = Orientation.Horizontal
+    make_box = staticmethod(NodeFormatter.from_string)
+    stats = None
 
     def __init__(
             self,
@@ -27,6 +51,15 @@ class LinkedListFormatter:
             border: bool,
             max_depth: int,
             orientation: bool,
+            max_nodes: int = -1,
+            max_chars: int = -1,
+            timeout: float = None,
+            on_truncate: Callable[[str], Any] = None,
+            on_stats: Callable[[RenderStats], Any] = None,
+            cycle_marker: Callable[[T], Any] = None,
+            plain: bool = False,
+            ascii_only: bool = False,
+            pause_gc: bool = False,
     ):
         self.get_node_val = get_val
         self.get_next = get_next
@@ -36,64 +69,177 @@ class LinkedListFormatter:
         self.show_newline = show_newline_literal
         self.newline_literal = newline_literal
         self.start_message = start_message
-        self.color = color
+        self.color = '' if plain else color
         self.border = border
         self.max_depth = max_depth
         self.orientation = orientation
+        self.max_nodes = max_nodes
+        self.max_chars = max_chars
+        self.timeout = timeout
+        self.on_truncate = on_truncate
+        self.on_stats = on_stats
+        self.cycle_marker = cycle_marker
+        self.plain = plain
+        self.ascii_only = ascii_only
+        self.pause_gc = pause_gc
+        self.table = ASCII_TABLE if ascii_only else None
+        if plain:
+            self.make_box = NodeFormatter.from_plain_string
+        arrows = VERTICAL_ARROWS if orientation == Orientation.Vertical else HORIZONTAL_ARROWS
+        self.arrows = {key: self.glyphs(arrow) for key, arrow in arrows.items()}
+        self.resolve_style()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state['box_cache'] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        TreeFormatter.__setstate__(self, state)
+
+    def __copy__(self) -> 'LinkedListFormatter':
+        return TreeFormatter.__copy__(self)
 
     def format(self, node: T) -> str:
-        if self.orientation == Orientation.Vertical:
-            res = self.linked_list_vertical_join(node)
-        else:
-            res = self.linked_list_horizontal_join(node)
-        res = res.to_str().rstrip()
+        return '\n'.join(self.iter_lines(node))
+
+    def iter_lines(self, node: T) -> Iterator[str]:
+        if self.on_stats and self.stats is None:
+            return self.profiled().iter_lines(node)
+        budget = self.make_budget()
+        if budget is not None:
+            budget.visit()
+        with GcPause(self.pause_gc):
+            if self.orientation == Orientation.Vertical:
+                lines = self.linked_list_vertical_join(node, budget).lines()
+            else:
+                lines = self.linked_list_horizontal_join(node, budget).lines()
+        lines = strip_trailing_lines(lines)
         if self.start_message:
-            return f'{ self.start_message(node) }\n{ res }'
-        return res
-
-    def get_arrow(self, prev_node: T, next_node: T) -> str:
-        is_next = self.get_next(prev_node) is next_node
-        is_prev = self.get_prev(next_node) is prev_node if self.get_prev else False
-        if self.orientation == Orientation.Vertical:
-            return {
-                (True, True): '↕',
-                (True, False): '↓',
-                (False, True): '↑',
-                (False, False): ' ',
-            }[(is_next, is_prev)]
-        else:
-            return {
-                (True, True): '↔',
-                (True, False): '→',
-                (False, True): '←',
-                (False, False): ' ',
-            }[(is_next, is_prev)]
-
-    def linked_list_vertical_join(self, node: T, depth: int = 0) -> NodeFormatter:
-        nxt = self.get_next(node)
-        arrow = self.get_arrow(node, nxt) if nxt else ''
-        node = self.add_styles(node)
-        if nxt and (self.max_depth == -1 or depth < self.max_depth):
-            nxt = self.linked_list_vertical_join(nxt, depth + 1)
-            nxt.lines.insert(0, ' ' * nxt.get_middle_width() + arrow)
-            return add_parent_top(node, nxt)
-        return node
-
-    def linked_list_horizontal_join(self, node: T, depth: int = 0) -> NodeFormatter:
-        nxt = self.get_next(node)
-        arrow = self.get_arrow(node, nxt) if nxt else ''
-        node = self.add_styles(node)
-        if nxt and (self.max_depth == -1 or depth < self.max_depth):
-            nxt = self.linked_list_horizontal_join(nxt, depth + 1)
-            middle = nxt.get_middle_height()
-            nxt.lines = [
-                (arrow if i == middle else ' ') + line
-                for i, line in enumerate(nxt.lines)
-            ]
-            return add_parent_left(node, nxt)
-        return node
-
-    def add_styles(self, node: NodeFormatter) -> NodeFormatter:
-        return TreeFormatter.add_styles(self, node)
+            lines = chain([self.start_message(node)], lines)
+        if budget is not None:
+            lines = budget.limit_lines(lines)
+        if self.stats is not None:
+            lines = self.stats.count_lines(lines)
+        return lines
+
+    def profiled(self) -> 'LinkedListFormatter':
+        formatter = RenderStats(self.on_stats).instrument(self, PHASES)
+        formatter.visit_node = formatter.stats.counted(formatter.visit_node)
+        return formatter
+
+    def make_budget(self) -> Budget:
+        return TreeFormatter.make_budget(self)
+
+    def write_to(self, stream: TextIO, node: T) -> None:
+        write_lines(stream, self.iter_lines(node))
+
+    def linked_list_vertical_join(self, node: T, budget: Budget = None) -> Layout:
+        boxes, arrows = self.walk_chain(node, budget)
+        own_middles = [box.get_middle_width() for box in boxes]
+        middles = self.chain_middles(own_middles)
+        # the same offsets add_parent_top would give each node above the rest of the list, without nesting
+        placements = []
+        x = y = width = 0
+        for box, arrow, middle, rest in zip(boxes, arrows, own_middles, middles[1:]):
+            placements.append((x + max(rest - middle, 0), y, box))
+            width = max(width, placements[-1][0] + box.width)
+            x += max(middle - rest, 0)
+            y += box.height
+            placements.append((x + max(rest, 0), y, self.arrow_box(arrow)))
+            y += 1
+        placements.append((x, y, boxes[-1]))
+        width = max(width, x + boxes[-1].width)
+        return Layout(width, y + boxes[-1].height, middles[0], placements)
+
+    def linked_list_horizontal_join(self, node: T, budget: Budget = None) -> Layout:
+        boxes, arrows = self.walk_chain(node, budget)
+        own_middles = [box.get_middle_height() for box in boxes]
+        middles = self.chain_middles(own_middles)
+        # the same offsets add_parent_left would give each node left of the rest of the list, without nesting
+        placements = []
+        pads = []
+        x = y = height = 0
+        for box, arrow, middle, rest in zip(boxes, arrows, own_middles, middles[1:]):
+            top = y + max(rest - middle, 0)
+            placements.append((x, top, box))
+            pads.append((top, top + box.height, x + box.width, False))
+            height = max(height, top + box.height)
+            x += box.width
+            y += max(middle - rest, 0)
+            placements.append((x, y + rest, self.arrow_box(arrow)))
+            x += 1
+        placements.append((x, y, boxes[-1]))
+        height = max(height, y + boxes[-1].height)
+        return Layout(x + boxes[-1].width, height, middles[0], placements, pads)
+
+    def walk_chain(self, node: T, budget: Budget = None) -> (list[NodeFormatter], list[str]):
+        # follows get_next until the end, max_depth, the budget or a node that was already drawn (a cycle).
+        # seen keeps [node, text, previous node] of every drawn node, so no callback runs twice for the same node
+        seen = {}
+        boxes = []
+        arrows = []
+        depth = 0
+        prev = _MISSING
+        while True:
+            entry = seen[id(node)] = [node, str(self.get_node_val(node)), prev]
+            boxes.append(self.visit_node(node, depth, entry[1]))
+            if self.max_depth != -1 and depth >= self.max_depth:
+                return boxes, arrows
+            nxt = self.get_next(node)
+            if not nxt:
+                return boxes, arrows
+            entry = seen.get(id(nxt))
+            if entry is None:
+                prev = self.get_prev(nxt) if self.get_prev else None
+            else:
+                if entry[2] is _MISSING:
+                    entry[2] = self.get_prev(nxt) if self.get_prev else None
+                prev = entry[2]
+            arrows.append(self.arrows[prev is node])
+            if entry is not None:
+                boxes.append(self.add_styles(nxt, self.cycle_text(nxt, entry[1])))
+                return boxes, arrows
+            if budget is not None and not budget.visit():
+                boxes.append(self.add_styles(None, self.more_text(MoreChildren())))
+                return boxes, arrows
+            node = nxt
+            depth += 1
+
+    def visit_node(self, node: T, depth: int, text: str = None) -> NodeFormatter:
+        return self.add_styles(node, text)
+
+    @staticmethod
+    def chain_middles(middles: list[int]) -> list[int]:
+        # the middle of the list from each node on, which is where the rest of the list hangs from
+        middles = list(middles)
+        for i in range(len(middles) - 2, -1, -1):
+            middles[i] = max(middles[i], middles[i + 1])
+        return middles
+
+    @staticmethod
+    def arrow_box(arrow: str) -> NodeFormatter:
+        # arrows are only ever read once placed, so each one is made once and shared
+        if arrow not in ARROW_BOXES:
+            ARROW_BOXES[arrow] = NodeFormatter([arrow], height=1, width=1, widths=[1])
+        return ARROW_BOXES[arrow]
+
+    def add_styles(self, node: T, contents: str = None) -> NodeFormatter:
+        return TreeFormatter.add_styles(self, node, contents)
+
+    def style_box(self, contents: str, pad_bottom: bool = False) -> NodeFormatter:
+        return TreeFormatter.style_box(self, contents, pad_bottom)
+
+    def resolve_style(self) -> None:
+        TreeFormatter.resolve_style(self)
+
+    def glyphs(self, text: str) -> str:
+        return TreeFormatter.glyphs(self, text)
+
+    def more_text(self, node: MoreChildren) -> str:
+        return TreeFormatter.more_text(self, node)
+
+    def cycle_text(self, node: T, text: str = None) -> str:
+        return TreeFormatter.cycle_text(self, node, text)
 
 
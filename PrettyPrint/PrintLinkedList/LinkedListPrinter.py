@@ -1,9 +1,17 @@
-from typing import Callable, Iterable, Any, TypeVar
-from colorama import Back
+from functools import partial
+from operator import attrgetter
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Any, TextIO, TypeVar, Union
 
 from PrettyPrint.PrintLinkedList.LinkedListFormatter import LinkedListFormatter
+from PrettyPrint.Utils.Colors import DEFAULT_COLOR
+from PrettyPrint.Utils.CompiledPrinter import CompiledPrinter, DEFAULT_CHUNK_SIZE
+from PrettyPrint.Utils.LazyRender import LazyRender
 from PrettyPrint.Utils.Orientation import Orientation
+from PrettyPrint.Utils.RenderStats import RenderStats
 
+if TYPE_CHECKING:
+    import logging
+    from concurrent.futures import Executor
 
 T = TypeVar("T")
 
@@ -24,13 +32,22 @@ class PrettyPrintLinkedList:
             trim: int = -1,
             trim_symbol: str = "...",
             start_message: Callable[[T], str] = None,
-            color: str = Back.LIGHTBLACK_EX,
+            color: str = DEFAULT_COLOR,
             border: bool = False,
             max_depth: int = -1,
             orientation: bool = Vertical,
+            max_nodes: int = -1,
+            max_chars: int = -1,
+            timeout: float = None,
+            on_truncate: Callable[[str], Any] = None,
+            on_stats: Callable[[RenderStats], Any] = None,
+            cycle_marker: Callable[[T], Any] = None,
+            plain: bool = False,
+            ascii_only: bool = False,
+            pause_gc: bool = False,
     ):
-        self.default_get_node_val = get_val or (lambda x: x.value)
-        self.default_get_next = get_next or (lambda x: x.next)
+        self.default_get_node_val = get_val or attrgetter('value')
+        self.default_get_next = get_next or attrgetter('next')
         self.default_get_prev = get_prev
         self.default_trim = trim
         self.default_trim_symbol = trim_symbol
@@ -42,6 +59,15 @@ class PrettyPrintLinkedList:
         self.default_border = border
         self.default_max_depth = max_depth
         self.default_orientation = orientation
+        self.default_max_nodes = max_nodes
+        self.default_max_chars = max_chars
+        self.default_timeout = timeout
+        self.default_on_truncate = on_truncate
+        self.default_on_stats = on_stats
+        self.default_cycle_marker = cycle_marker
+        self.default_plain = plain
+        self.default_ascii_only = ascii_only
+        self.default_pause_gc = pause_gc
 
     def __call__(
             self,
@@ -60,8 +86,103 @@ class PrettyPrintLinkedList:
             border: bool = None,
             max_depth: int = -1,
             orientation: bool = None,
+            max_nodes: int = -1,
+            max_chars: int = -1,
+            timeout: float = None,
+            on_truncate: Callable[[str], Any] = None,
+            on_stats: Callable[[RenderStats], Any] = None,
+            cycle_marker: Callable[[T], Any] = None,
+            plain: bool = None,
+            ascii_only: bool = None,
+            pause_gc: bool = None,
     ):
-        linked_list_formatter = LinkedListFormatter(
+        res = self.make_formatter(
+            get_val=get_val,
+            get_prev=get_prev,
+            get_next=get_next,
+            show_newline_literal=show_newline_literal,
+            newline_literal=newline_literal,
+            trim=trim,
+            trim_symbol=trim_symbol,
+            start_message=start_message,
+            color=color,
+            border=border,
+            max_depth=max_depth,
+            orientation=orientation,
+            max_nodes=max_nodes,
+            max_chars=max_chars,
+            timeout=timeout,
+            on_truncate=on_truncate,
+            on_stats=on_stats,
+            cycle_marker=cycle_marker,
+            plain=plain,
+            ascii_only=ascii_only,
+            pause_gc=pause_gc,
+        ).format(node)
+        if return_instead_of_print or (return_instead_of_print is None and self.default_dont_print):
+            return res
+        print(res)
+
+    def iter_lines(self, node: T, *args, **kwargs) -> Iterator[str]:
+        return self.make_formatter(*args, **kwargs).iter_lines(node)
+
+    def write_to(self, stream: TextIO, node: T, *args, **kwargs) -> None:
+        self.make_formatter(*args, **kwargs).write_to(stream, node)
+
+    def compile(self, *args, **kwargs) -> CompiledPrinter:
+        return CompiledPrinter(self.make_formatter(*args, **kwargs))
+
+    def render_all(
+            self,
+            roots: Iterable[T],
+            *args,
+            processes: Union[int, 'Executor'] = None,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            **kwargs
+    ) -> Iterator[str]:
+        return self.compile(*args, **kwargs).render_all(roots, processes, chunk_size)
+
+    def lazy(self, node: T, *args, **kwargs) -> LazyRender:
+        return LazyRender(partial(self, node, *args, return_instead_of_print=True, **kwargs))
+
+    def log_formatter(
+            self,
+            fmt: str = None,
+            datefmt: str = None,
+            style: str = '%',
+            attribute: str = 'tree',
+            **kwargs
+    ) -> 'logging.Formatter':
+        # imported here so importing PrettyPrint doesn't import logging
+        from PrettyPrint.Utils.TreeLogFormatter import TreeLogFormatter
+        return TreeLogFormatter(self.compile(**kwargs), fmt, datefmt, style, attribute)
+
+    def make_formatter(
+            self,
+            get_val: Callable[[T], Any] = None,
+            get_prev: Callable[[T], T] = None,
+            get_next: Callable[[T], T] = None,
+            *,
+            show_newline_literal: bool = None,
+            newline_literal: str = None,
+            trim: int = -1,
+            trim_symbol: str = None,
+            start_message: Callable[[T], str] = None,
+            color: str = None,
+            border: bool = None,
+            max_depth: int = -1,
+            orientation: bool = None,
+            max_nodes: int = -1,
+            max_chars: int = -1,
+            timeout: float = None,
+            on_truncate: Callable[[str], Any] = None,
+            on_stats: Callable[[RenderStats], Any] = None,
+            cycle_marker: Callable[[T], Any] = None,
+            plain: bool = None,
+            ascii_only: bool = None,
+            pause_gc: bool = None,
+    ) -> LinkedListFormatter:
+        return LinkedListFormatter(
             get_val=get_val or self.default_get_node_val,
             get_next=get_next or self.default_get_next,
             get_prev=get_prev or self.default_get_prev,
@@ -74,8 +195,13 @@ class PrettyPrintLinkedList:
             border=self.default_border if border is None else border,
             max_depth=max_depth if max_depth != -1 else self.default_max_depth,
             orientation=self.default_orientation if orientation is None else orientation,
+            max_nodes=max_nodes if max_nodes != -1 else self.default_max_nodes,
+            max_chars=max_chars if max_chars != -1 else self.default_max_chars,
+            timeout=self.default_timeout if timeout is None else timeout,
+            on_truncate=on_truncate or self.default_on_truncate,
+            on_stats=on_stats or self.default_on_stats,
+            cycle_marker=cycle_marker or self.default_cycle_marker,
+            plain=self.default_plain if plain is None else plain,
+            ascii_only=self.default_ascii_only if ascii_only is None else ascii_only,
+            pause_gc=self.default_pause_gc if pause_gc is None else pause_gc,
         )
-        res = linked_list_formatter.format(node)
-        if return_instead_of_print or (return_instead_of_print is None and self.default_dont_print):
-            return res
-        print(res)
@@ -0,0 +1,96 @@
+from array import array
+from collections import Counter
+from itertools import accumulate, repeat
+from operator import add
+from typing import Any, Sequence
+
+
+# a tree stored as index arrays (lists, array.array or numpy arrays), drawn by walking the indexes themselves instead
+# of wrapping every node in an object. the children of node i are indices[indptr[i]:indptr[i + 1]] (CSR)
+class ArrayTree:
+    __slots__ = ('indptr', 'indices', 'values', 'labels', 'root')
+
+    def __init__(
+            self,
+            indptr: Sequence[int],
+            indices: Sequence[int],
+            values: Sequence[Any] = None,
+            labels: Sequence[Any] = None,
+            root: int = 0,
+            value_format: str = None
+    ):
+        self.indptr = indptr if isinstance(indptr, array) else array('q', to_python(indptr))
+        # every node is one int object, so a node reached twice is known to be the same node (for cycles and
+        # share_subtrees) like it would be with node objects
+        nodes = list(range(len(self.indptr) - 1))
+        self.indices = list(map(nodes.__getitem__, to_python(indices)))
+        self.values = None if values is None else format_values(values, value_format)
+        self.labels = None if labels is None else format_labels(labels)
+        self.root = nodes[root]
+
+    @classmethod
+    def from_children(
+            cls,
+            children_left: Sequence[int],
+            children_right: Sequence[int],
+            values: Sequence[Any] = None,
+            labels: Sequence[Any] = None,
+            root: int = 0,
+            value_format: str = None
+    ) -> 'ArrayTree':
+        # like scikit-learn's tree_.children_left and tree_.children_right, where -1 means there's no child
+        left, right = to_python(children_left), to_python(children_right)
+        indices = [child for pair in zip(left, right) for child in pair if child >= 0]
+        indptr = array('q', accumulate(map(add, map((0).__le__, left), map((0).__le__, right)), initial=0))
+        return cls(indptr, indices, values, labels, root, value_format)
+
+    @classmethod
+    def from_parents(
+            cls,
+            parents: Sequence[int],
+            values: Sequence[Any] = None,
+            labels: Sequence[Any] = None,
+            value_format: str = None
+    ) -> 'ArrayTree':
+        # the root is the one node with a negative parent
+        parents = to_python(parents)
+        roots = [node for node, parent in enumerate(parents) if parent < 0]
+        if len(roots) != 1:
+            raise ValueError(f'parents must have exactly one root (a negative parent), found {len(roots)}')
+        counts = Counter(parents)
+        indptr = array('q', accumulate(map(counts.get, range(len(parents)), repeat(0)), initial=0))
+        # a stable sort keeps each node's children in index order, the root's negative parent sorts it first
+        indices = sorted(range(len(parents)), key=parents.__getitem__)[1:]
+        return cls(indptr, indices, values, labels, roots[0], value_format)
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    def children(self, node: int) -> list[int]:
+        indptr = self.indptr
+        return self.indices[indptr[node]:indptr[node + 1]]
+
+    def value(self, node: int) -> Any:
+        return node if self.values is None else self.values[node]
+
+    def label(self, node: int) -> Any:
+        return None if self.labels is None else self.labels[node]
+
+
+def to_python(values: Sequence[Any]) -> Sequence[Any]:
+    # iterating a numpy array makes a numpy scalar per item, which is far slower than converting it in one call
+    return values.tolist() if hasattr(values, 'astype') else values
+
+
+def format_values(values: Sequence[Any], value_format: str = None) -> list[str]:
+    if value_format is None:
+        if hasattr(values, 'astype'):
+            # numpy formats the whole array at once
+            return values.astype(str).tolist()
+        return list(map(str, values))
+    return list(map(value_format.__mod__, to_python(values)))
+
+
+def format_labels(labels: Sequence[Any]) -> list[str]:
+    # a missing label stays None, so the node is drawn without one (like get_label returning None)
+    return [None if label is None else str(label) for label in to_python(labels)]
@@ -0,0 +1,120 @@
+import copy
+from collections import deque
+from functools import partial
+from operator import attrgetter
+from typing import Callable, Any, TypeVar
+
+from PrettyPrint.PrintTree.TreeFormatter import TreeFormatter, MoreChildren, TAIL_SCAN_LIMIT
+
+T = TypeVar("T")
+DEFAULT_CONCURRENCY = 16
+
+
+# a node whose value, label and children were already fetched, so the (synchronous) layout code can use it as is
+class FetchedNode:
+    __slots__ = ('node', 'val', 'label', 'children', 'depth', 'expanded')
+
+    def __init__(self, node: T):
+        self.node = node
+        self.val = self.label = self.children = self.depth = None
+        self.expanded = False
+
+
+async def call(callback: Callable[[T], Any], node: T) -> Any:
+    res = callback(node)
+    if hasattr(res, '__await__'):
+        res = await res
+    return res
+
+
+async def fetch_node(fetched: FetchedNode, formatter: TreeFormatter, get_val: bool, expand: bool) -> list:
+    node = fetched.node
+    children = None
+    if expand:
+        res = await call(formatter.get_children, node)
+        if hasattr(res, '__aiter__'):
+            children = await collect_children(res, formatter)
+        else:
+            children = list(formatter.limit_children(res)) if res else []
+    if get_val:
+        fetched.val = await call(formatter.get_node_val, node)
+        if formatter.get_label:
+            fetched.label = await call(formatter.get_label, node)
+    return children
+
+
+async def collect_children(children: Any, formatter: TreeFormatter) -> list:
+    res = []
+    async for child in children:
+        if not formatter.tail_children and len(res) == formatter.max_children:
+            return res + [MoreChildren()]
+        if formatter.tail_children and len(res) == formatter.max_children + TAIL_SCAN_LIMIT:
+            return res[:formatter.max_children - formatter.tail_children] + [MoreChildren()]
+        res.append(child)
+    return list(formatter.limit_children(res))
+
+
+async def fetch_tree(root: T, formatter: TreeFormatter, concurrency: int = DEFAULT_CONCURRENCY) -> FetchedNode:
+    # imported here so importing PrettyPrint stays fast for the (usual) synchronous use
+    import asyncio
+    max_depth = formatter.max_depth
+    fetched = {id(root): FetchedNode(root)}
+    todo = deque([(fetched[id(root)], 0)])
+    running = {}
+    try:
+        while todo or running:
+            while todo and len(running) < concurrency:
+                node, depth = todo.popleft()
+                if node.depth is not None and node.depth <= depth:
+                    continue
+                get_val = node.depth is None
+                node.depth = depth
+                if node.children is not None:
+                    # reached by a shorter path, so its children may now be above max_depth too
+                    todo.extend((child, depth + 1) for child in node.children if isinstance(child, FetchedNode))
+                    continue
+                expand = not node.expanded and (max_depth == -1 or depth < max_depth)
+                node.expanded = node.expanded or expand
+                if get_val or expand:
+                    task = asyncio.ensure_future(fetch_node(node, formatter, get_val, expand))
+                    running[task] = node
+            if not running:
+                continue
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                node = running.pop(task)
+                children = task.result()
+                if children is not None:
+                    node.children = []
+                    for child in children:
+                        if isinstance(child, MoreChildren):
+                            node.children.append(child)
+                            continue
+                        if id(child) not in fetched:
+                            fetched[id(child)] = FetchedNode(child)
+                        node.children.append(fetched[id(child)])
+                    todo.extend((child, node.depth + 1) for child in node.children if isinstance(child, FetchedNode))
+    finally:
+        for task in running:
+            task.cancel()
+    return fetched[id(root)]
+
+
+def fetched_formatter(formatter: TreeFormatter) -> TreeFormatter:
+    formatter = copy.copy(formatter)
+    formatter.max_children = -1
+    formatter.get_children = attrgetter('children')
+    formatter.get_node_val = attrgetter('val')
+    if formatter.get_label:
+        formatter.get_label = attrgetter('label')
+    if formatter.start_message:
+        formatter.start_message = partial(on_original, formatter.start_message)
+    if formatter.shared_marker:
+        formatter.shared_marker = partial(on_original, formatter.shared_marker)
+    if formatter.cycle_marker:
+        formatter.cycle_marker = partial(on_original, formatter.cycle_marker)
+    return formatter
+
+
+def on_original(callback: Callable[[T], Any], node: FetchedNode) -> Any:
+    return callback(node.node)
@@ -1,69 +1,65 @@
+from PrettyPrint.Utils.Layout import Layout
 from PrettyPrint.Utils.NodeFormatter import NodeFormatter
-from PrettyPrint.Utils.StyleAwareUtils import ljust
-from PrettyPrint.Utils.ZipLongest import zip_longest
 
+PIPES = '┌└├│┬┴┤┼─'
 
-def join_vertically(boxes: [NodeFormatter]) -> NodeFormatter:
-    lines, width, height = join_boxes(boxes)
-    middle = add_pipes(boxes, lines)
+
+def to_layout(box: NodeFormatter) -> Layout:
+    return Layout.from_box(box, box.get_middle_height())
+
+
+def join_vertically(boxes: [Layout], pipes: str = PIPES) -> Layout:
+    placements, width, height = join_boxes(boxes)
+    pipes, start, middle = make_pipes(boxes, pipes)
+    placements.insert(0, (0, start, pipes))
     width += 1
-    return NodeFormatter(lines, height=height, width=width, middle_height=middle)
+    return Layout(width, height, middle, placements)
 
 
-def join_boxes(boxes: [NodeFormatter]) -> ([str], int, int):
-    lines = [line for box in boxes for line in box.lines]
+def join_boxes(boxes: [Layout]) -> ([tuple], int, int):
+    placements = []
+    y = 0
+    for box in boxes:
+        placements.append((1, y, box))
+        y += box.height
     width = max(box.width for box in boxes)
-    height = sum(box.height for box in boxes) + len(boxes) - 1
-    return lines, width, height
+    return placements, width, y
 
 
-def add_pipes(boxes: [NodeFormatter], lines: [str]) -> int:
-    start = boxes[0].get_middle_height()
-    end = boxes[-1].get_middle_height() + sum(box.height for box in boxes[:-1])
-    middles = iter(box.get_middle_height() for box in boxes[1:-1])
+def make_pipes(boxes: [Layout], glyphs: str = PIPES) -> (NodeFormatter, int, int):
+    top, bottom, tee, line, top_tee, bottom_tee, line_tee, cross, _ = glyphs
+    start = boxes[0].middle
+    end = boxes[-1].middle + sum(box.height for box in boxes[:-1])
+    middles = iter(box.middle for box in boxes[1:-1])
     heights = iter(box.height for box in boxes)
     middle = next(middles, None)
     box_start = next(heights)
-    for i, line in enumerate(lines):
-        if i < start or i > end:
-            lines[i] = ' ' + line
-        elif i == start:
-            lines[i] = '┌' + line
+    middle_of_pipes = start + sum(divmod(end - start + 1, 2)) - 1
+    pipes = []
+    for i in range(start, end + 1):
+        # the pipe level with the parent is the junction version of whichever pipe is there
+        joint = i == middle_of_pipes
+        if i == start:
+            pipes.append(top_tee if joint else top)
         elif i == end:
-            lines[i] = '└' + line
+            pipes.append(bottom_tee if joint else bottom)
         elif middle is not None and i == box_start + middle:
-            lines[i] = '├' + line
+            pipes.append(cross if joint else tee)
             box_start += next(heights)
             middle = next(middles, None)
         else:
-            lines[i] = '│' + line
-
-    middle_of_pipes = start + sum(divmod(end - start + 1, 2)) - 1
-    pipe_dict = {'┌': '┬', '└': '┴', '│': '┤', '├': '┼'}
-    middle_line = lines[middle_of_pipes]
-    lines[middle_of_pipes] = pipe_dict[middle_line[0]] + middle_line[1:]
-    return middle_of_pipes
+            pipes.append(line_tee if joint else line)
+    return NodeFormatter(pipes, height=len(pipes), width=1, widths=[1] * len(pipes)), start, middle_of_pipes
 
 
-def add_parent(parent: NodeFormatter, children: NodeFormatter) -> NodeFormatter:
-    parent_middle, children_middle = parent.get_middle_height(), children.get_middle_height()
-    parent_width, children_width = parent.width, children.width
-    parent.lines = [ljust(line, parent.width) for line in parent.lines]
-
+def add_parent(parent: Layout, children: Layout) -> Layout:
+    parent_middle, children_middle = parent.middle, children.middle
     middle_offset = children_middle - parent_middle
-    parent_padding = ' ' * parent.width
-    if middle_offset > 0:
-        parent.lines = [parent_padding] * middle_offset + parent.lines
-    elif middle_offset < 0:
-        children.lines = [''] * (-middle_offset) + children.lines
-
-    lines = [
-        (parent_padding if parent_line is None else parent_line) + (child_line or '')
-        for parent_line, child_line in zip_longest(parent.lines, children.lines, default=None)
-    ]
-    return NodeFormatter(
-        lines,
-        height=max(len(parent.lines), len(children.lines)),
-        width=parent_width + children_width,
-        middle_height=max(children_middle, parent_middle)
+    parent_y, children_y = max(middle_offset, 0), max(-middle_offset, 0)
+    return Layout(
+        parent.width + children.width,
+        max(parent.height + parent_y, children.height + children_y),
+        max(children_middle, parent_middle),
+        [(0, parent_y, parent), (parent.width, children_y, children)],
+        [(parent_y, parent_y + parent.height, parent.width, False)]
     )
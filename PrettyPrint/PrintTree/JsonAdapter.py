@@ -0,0 +1,114 @@
+from collections.abc import Iterable, Sequence
+from functools import lru_cache
+from itertools import islice
+from typing import Any
+
+from PrettyPrint.PrintTree.JsonStream import PartialContainer
+from PrettyPrint.PrintTree.TreeFormatter import MoreChildren
+
+
+# reads a json document in place instead of copying it into JsonTree nodes,
+# the only objects made are a JsonKey per dict entry, while it's being drawn
+class JsonKey:
+    __slots__ = ('key', 'value')
+
+    def __init__(self, key: Any, value: Any):
+        self.key = key
+        self.value = value
+
+    # the names JsonTree nodes had, so label callbacks written for them keep working
+    @property
+    def val(self) -> Any:
+        return self.key
+
+    @property
+    def children(self) -> list:
+        return list(json_children(self))
+
+
+class DictChildren(Sequence):
+    __slots__ = ('dic',)
+
+    def __init__(self, dic: dict):
+        self.dic = dic
+
+    def __len__(self) -> int:
+        return len(self.dic)
+
+    def __iter__(self):
+        return (JsonKey(key, value) for key, value in self.dic.items())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [JsonKey(key, value) for key, value in islice(self.dic.items(), *index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        for key, value in islice(self.dic.items(), index, None):
+            return JsonKey(key, value)
+        raise IndexError(index)
+
+
+class PartialChildren(Sequence):
+    # the children of a PartialContainer, positioned as if the hidden ones were still between head and tail
+    __slots__ = ('head', 'hidden', 'tail')
+
+    def __init__(self, container: PartialContainer):
+        self.head = container.head
+        self.hidden = container.hidden
+        self.tail = container.tail
+        if container.is_dict:
+            self.head = [JsonKey(key, value) for key, value in self.head]
+            self.tail = [JsonKey(key, value) for key, value in self.tail]
+
+    def __len__(self) -> int:
+        return len(self.head) + self.hidden + len(self.tail)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < len(self.head):
+            return self.head[index]
+        if index >= len(self.head) + self.hidden:
+            return self.tail[index - len(self.head) - self.hidden]
+        raise IndexError(index)
+
+
+def is_container(value: Any) -> bool:
+    return isinstance(value, Iterable) and not isinstance(value, str)
+
+
+def container_children(value: Any) -> Iterable:
+    if isinstance(value, dict):
+        return DictChildren(value)
+    if isinstance(value, PartialContainer):
+        if value.hidden is None:
+            # it wasn't read to the end, so there's no count
+            return iter(PartialChildren(value).head + [MoreChildren()])
+        return PartialChildren(value)
+    return value
+
+
+def json_children(node: Any) -> Iterable:
+    if isinstance(node, JsonKey):
+        value = node.value
+        if value is None:
+            return []
+        return container_children(value) if is_container(value) else [value]
+    if is_container(node):
+        return container_children(node)
+    return []
+
+
+def json_val(node: Any) -> Any:
+    if isinstance(node, JsonKey):
+        return node.key
+    if is_container(node):
+        return type_name(node.kind if isinstance(node, PartialContainer) else type(node))
+    return node
+
+
+@lru_cache(maxsize=None)
+def type_name(cls: type) -> str:
+    return str(cls).removeprefix("<class '").removesuffix("'>").upper()
@@ -0,0 +1,264 @@
+import re
+from collections import deque
+from json import JSONDecodeError, JSONDecoder
+from json.decoder import scanstring
+from typing import Any, TextIO
+
+READ_CHUNK_SIZE = 1 << 16
+WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+# a string up to its closing quote, the end of the buffer or a backslash whose escaped char isn't read yet
+STRING_BODY_RE = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+NUMBER_RE = re.compile(r'-?(?:0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?|-Infinity')
+LITERAL_RE = re.compile(r'true|false|null|NaN|Infinity')
+CLOSE = {dict: '}', list: ']'}
+# the same values json.load accepts
+LITERALS = {
+    'true': True, 'false': False, 'null': None,
+    'NaN': float('nan'), 'Infinity': float('inf'), '-Infinity': float('-inf')
+}
+# a number can look complete even though the next chunk continues it ('1' + '.5', '1e' + '-3')
+LOOKAHEAD = 3
+SCAN = JSONDecoder().scan_once
+SCAN_LIMIT = 1 << 20
+
+
+# a dict or list that was only partly read: head and tail are the items that were kept
+# and hidden is how many were left out between them (None when it wasn't read to the end)
+class PartialContainer:
+    __slots__ = ('kind', 'head', 'tail', 'hidden')
+
+    def __init__(self, kind: type, head: list, tail: list, hidden: int):
+        self.kind = kind
+        self.head = head
+        self.tail = tail
+        self.hidden = hidden
+
+    @property
+    def is_dict(self) -> bool:
+        return self.kind is dict
+
+    def __iter__(self):
+        yield from self.head
+        yield from self.tail
+
+
+class JsonReader:
+    def __init__(self, stream: TextIO, chunk_size: int = READ_CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def error(self, message: str) -> JSONDecodeError:
+        return JSONDecodeError(message, self.buffer, self.pos)
+
+    def peek(self) -> str:
+        while True:
+            self.pos = WHITESPACE_RE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self.error(f"Expecting '{char}'")
+        self.pos += 1
+
+    def match(self, regex: re.Pattern, message: str) -> re.Match:
+        while True:
+            match = regex.match(self.buffer, self.pos)
+            if match and match.end() + LOOKAHEAD < len(self.buffer):
+                break
+            if not self.fill():
+                match = regex.match(self.buffer, self.pos)
+                break
+        if not match:
+            raise self.error(message)
+        self.pos = match.end()
+        return match
+
+    def read_string(self) -> str:
+        # a long string spans many chunks, so the part that was already checked is set aside instead of being
+        # scanned (and copied) again with every chunk
+        parts = []
+        start = self.pos
+        end = start + 1
+        while True:
+            end = STRING_BODY_RE.match(self.buffer, end).end()
+            if end < len(self.buffer) and self.buffer[end] == '"':
+                break
+            # the end of the buffer, or a backslash whose escaped char is in the next chunk
+            parts.append(self.buffer[start:end])
+            self.pos = end
+            if not self.fill():
+                raise self.error('Unterminated string')
+            start = end = 0
+        parts.append(self.buffer[start:end + 1])
+        self.pos = end + 1
+        return scanstring(''.join(parts), 1)[0]
+
+    def read_scalar(self) -> Any:
+        char = self.peek()
+        if char == '"':
+            return self.read_string()
+        if char == '-' or char.isdigit():
+            number = self.match(NUMBER_RE, 'Expecting value')
+            if number.group() == '-Infinity':
+                return LITERALS[number.group()]
+            if number.group(1) or number.group(2):
+                return float(number.group())
+            return int(number.group())
+        return LITERALS[self.match(LITERAL_RE, 'Expecting value').group()]
+
+    def scan_value(self) -> bool:
+        # json's own scanner is far faster than walking the brackets here, but it builds what it reads, so it's
+        # only trusted with values that fit in a bounded window. returns False (without moving) for bigger containers
+        char = self.peek()
+        while True:
+            try:
+                end = SCAN(self.buffer, self.pos)[1]
+                if end + LOOKAHEAD < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return True
+            except (StopIteration, ValueError):
+                pass
+            if len(self.buffer) - self.pos > SCAN_LIMIT or not self.fill():
+                break
+        if char in ('[', '{'):
+            return False
+        self.read_scalar()
+        return True
+
+    def skip_items(self, kind: type) -> int:
+        # skips the rest of a container (from just after its '[', '{' or a ',') and returns how many items that was
+        kinds = [kind]
+        count = 0
+        after_value = False
+        while True:
+            while self.peek() == CLOSE[kinds[-1]]:
+                self.pos += 1
+                kinds.pop()
+                if not kinds:
+                    return count
+                count += len(kinds) == 1
+                after_value = True
+            if after_value:
+                self.expect(',')
+            if kinds[-1] is dict:
+                if self.peek() != '"':
+                    raise self.error('Expecting property name enclosed in double quotes')
+                self.scan_value()
+                self.expect(':')
+            after_value = self.scan_value()
+            if after_value:
+                count += len(kinds) == 1
+            else:
+                kinds.append(dict if self.buffer[self.pos] == '{' else list)
+                self.pos += 1
+
+
+class Frame:
+    __slots__ = ('kind', 'level', 'head', 'tail', 'hidden', 'count', 'key')
+
+    def __init__(self, kind: type, level: int, tail_size: int):
+        self.kind = kind
+        self.level = level
+        self.head = []
+        self.tail = deque(maxlen=tail_size) if tail_size else None
+        self.hidden = 0
+        self.count = 0
+        self.key = None
+
+    def add(self, item: Any, head_size: int) -> None:
+        if self.kind is dict:
+            item = (self.key, item)
+        if len(self.head) < head_size:
+            self.head.append(item)
+        else:
+            if len(self.tail) == self.tail.maxlen:
+                self.hidden += 1
+            self.tail.append(item)
+
+    def finish(self) -> Any:
+        if not self.hidden:
+            items = self.head + list(self.tail or ())
+            return dict(items) if self.kind is dict else items
+        return PartialContainer(self.kind, self.head, list(self.tail or ()), self.hidden)
+
+
+def read_json(
+        stream: TextIO,
+        max_depth: int = -1,
+        max_children: int = -1,
+        tail_children: int = 0,
+        chunk_size: int = READ_CHUNK_SIZE
+) -> Any:
+    # reads only what print_json would draw with these settings: containers below max_depth are skipped over and
+    # only the first (and last) max_children items of each container are kept. once the top level container is
+    # full the rest of the stream isn't read at all (unless tail_children needs its end)
+    reader = JsonReader(stream, chunk_size)
+    head_size = float('inf') if max_children == -1 else max_children - tail_children
+    stack = []
+    value = open_value(reader, stack, 0, max_depth, tail_children)
+    if not stack:
+        return value
+    while True:
+        frame = stack[-1]
+        if reader.peek() == CLOSE[frame.kind]:
+            reader.pos += 1
+            value = frame.finish()
+            stack.pop()
+            if not stack:
+                return value
+            stack[-1].add(value, head_size)
+            continue
+        if frame.count:
+            reader.expect(',')
+        frame.count += 1
+        if frame.count > head_size and not tail_children:
+            if len(stack) == 1:
+                return PartialContainer(frame.kind, frame.head, [], None)
+            frame.hidden = reader.skip_items(frame.kind)
+            value = frame.finish()
+            stack.pop()
+            stack[-1].add(value, head_size)
+            continue
+        if frame.kind is dict:
+            if reader.peek() != '"':
+                raise reader.error('Expecting property name enclosed in double quotes')
+            frame.key = reader.read_scalar()
+            reader.expect(':')
+        value = open_value(reader, stack, frame.level + 1, max_depth, tail_children)
+        if stack[-1] is frame:
+            frame.add(value, head_size)
+
+
+def open_value(reader: JsonReader, stack: list, level: int, max_depth: int, tail_children: int) -> Any:
+    char = reader.peek()
+    if char not in ('[', '{'):
+        if not char:
+            raise reader.error('Expecting value')
+        return reader.read_scalar()
+    kind = dict if char == '{' else list
+    if max_depth != -1 and level >= max_depth:
+        # its children are too deep to be drawn, so an empty one of the same type draws the same
+        if not reader.scan_value():
+            reader.pos += 1
+            reader.skip_items(kind)
+        return kind()
+    reader.pos += 1
+    stack.append(Frame(kind, level, tail_children))
+    return None
@@ -1,5 +1,12 @@
+import warnings
 from typing import Iterable
 
+# print_json doesn't build these anymore (see JsonAdapter), the class is only kept for code that imports it
+warnings.warn(
+    "PrettyPrint.PrintTree.JsonTree is deprecated, print_json reads the json in place",
+    DeprecationWarning, stacklevel=2
+)
+
 
 class JsonTree:
     def __init__(self, val, children=None):
@@ -1,15 +1,78 @@
-from typing import Callable, Iterable, Any, TypeVar
+import copy
+from collections import deque
+from collections.abc import Sequence
+from itertools import chain, islice, tee
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Any, TextIO, TypeVar, Union
 
-from PrettyPrint.PrintTree.HorizontalTree import join_vertically, add_parent as add_parent_left
-from PrettyPrint.PrintTree.VerticalTree import join_horizontally, add_parent as add_parent_top
-from PrettyPrint.Utils.NodeFormatter import NodeFormatter
+from PrettyPrint.PrintTree.HorizontalTree import (
+    PIPES as LEFT_PIPES, join_vertically, add_parent as add_parent_left, to_layout as to_layout_left
+)
+from PrettyPrint.PrintTree.TreeView import TreeView
+from PrettyPrint.PrintTree.VerticalTree import (
+    PIPES as TOP_PIPES, join_horizontally, add_parent as add_parent_top, to_layout as to_layout_top
+)
+from PrettyPrint.PrintTree.VerticalTree import join_compact, add_parent_compact, to_compact_layout
+from PrettyPrint.Utils.Budget import Budget, TRUNCATED_MESSAGE
+from PrettyPrint.Utils.Colors import enable_color
+from PrettyPrint.Utils.Contour import Contour
+from PrettyPrint.Utils.GcPause import GcPause
+from PrettyPrint.Utils.Layout import Layout
+from PrettyPrint.Utils.LayoutCache import LayoutCache
+from PrettyPrint.Utils.NodeFormatter import NodeFormatter, BORDER, style
 from PrettyPrint.Utils.Orientation import Orientation
-from PrettyPrint.Utils.StyleAwareUtils import trim_text
+from PrettyPrint.Utils.RenderStats import RenderStats
+from PrettyPrint.Utils.Streaming import strip_trailing_lines, write_lines
+from PrettyPrint.Utils.StyleAwareUtils import ASCII_TABLE, strip_style, trim_text
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
 
 T = TypeVar("T")
+_DONE = object()
+_MISSING = object()
+_TEE = type(tee((), 1)[0])
+BOX_CACHE_SIZE = 4096
+# longer texts aren't kept, they're rarely repeated and the boxes of a few could hold megabytes
+BOX_CACHE_TEXT = 256
+# how many children an iterator is read past the printed ones to find its last ones (tail_children)
+TAIL_SCAN_LIMIT = 100_000
+PHASES = {
+    'get_children': 'get_children',
+    'get_node_val': 'get_val',
+    'get_label': 'get_label',
+    'start_message': 'start_message',
+    'shared_marker': 'shared_marker',
+    'cycle_marker': 'cycle_marker',
+    'add_styles': 'styles',
+    'make_box': 'measure',
+    'add_label': 'join',
+    'layout': 'walk',
+}
+
+
+# stands in for the children that were left out because of max_children
+class MoreChildren:
+    __slots__ = ('count',)
+
+    def __init__(self, count: int = None):
+        self.count = count
+
+    def __str__(self) -> str:
+        return '… more' if self.count is None else f'… {self.count} more'
+
+
+def replayable(children: Iterable[T]) -> Iterable[T]:
+    # an iterator can only be read once, but a node reached twice is drawn twice. copies of a tee all start
+    # from the beginning
+    if children is not None and iter(children) is children:
+        return tee(children, 1)[0]
+    return children
 
 
 class TreeFormatter:
+    make_box = staticmethod(NodeFormatter.from_string)
+    stats = None
+
     def __init__(
             self,
             get_children: Callable[[T], Iterable[T]],
@@ -25,98 +88,439 @@ class TreeFormatter:
             border: bool,
             max_depth: int,
             orientation: bool,
+            share_subtrees: bool = False,
+            shared_marker: Callable[[T], Any] = None,
+            cache: LayoutCache = None,
+            workers: Union[int, 'Executor'] = None,
+            max_children: int = -1,
+            tail_children: int = 0,
+            max_nodes: int = -1,
+            max_chars: int = -1,
+            timeout: float = None,
+            on_truncate: Callable[[str], Any] = None,
+            on_stats: Callable[[RenderStats], Any] = None,
+            cycle_marker: Callable[[T], Any] = None,
+            plain: bool = False,
+            ascii_only: bool = False,
+            compact: bool = False,
+            pause_gc: bool = False,
     ):
         self.get_children = get_children 
         self.get_node_val = get_val
         self.get_label = get_label
-        self.label_color = label_color
+        self.label_color = '' if plain else label_color
         self.trim = trim
         self.trim_symbol = trim_symbol
         self.show_newline = show_newline_literal
         self.newline_literal = newline_literal
         self.start_message = start_message
-        self.color = color
+        self.color = '' if plain else color
         self.border = border
         self.max_depth = max_depth
         self.orientation = orientation
+        self.share_subtrees = share_subtrees or shared_marker is not None
+        self.shared_marker = shared_marker
+        self.cache = cache
+        self.workers = workers
+        self.max_children = max_children
+        self.tail_children = min(tail_children, max_children) if max_children != -1 else 0
+        self.max_nodes = max_nodes
+        self.max_chars = max_chars
+        self.timeout = timeout
+        self.on_truncate = on_truncate
+        self.on_stats = on_stats
+        self.cycle_marker = cycle_marker
+        self.plain = plain
+        self.ascii_only = ascii_only
+        self.table = ASCII_TABLE if ascii_only else None
+        self.compact = compact
+        self.pause_gc = pause_gc
+        if plain:
+            self.make_box = NodeFormatter.from_plain_string
+        self.label_style = None
+        if self.label_color:
+            self.label_style = style(self.label_color, True)
+            enable_color()
+        self.top_pipes = self.glyphs(TOP_PIPES)
+        self.left_pipes = self.glyphs(LEFT_PIPES)
+        # between a label and its node, layouts are never changed once made so every render shares these
+        self.top_seperator = (to_compact_layout if compact else to_layout_top)(NodeFormatter.from_string('|'))
+        self.left_seperator = to_layout_left(NodeFormatter.from_string(self.left_pipes[-1]))
+        self.resolve_style()
+
+    def resolve_style(self) -> None:
+        # everything drawn the same way in every render is worked out once, here
+        self.node_style = style(self.color, add_space=not self.border) if self.color else None
+        self.border_glyphs = self.glyphs(BORDER)
+        self.cycle_symbol = self.glyphs('↺')
+        self.truncated_message = self.glyphs(TRUNCATED_MESSAGE)
+        # styled boxes by their text, shared by every node (in every render) of this formatter. boxes aren't changed
+        # once they're made, so nodes with the same value can all be drawn from one box instead of each measuring and
+        # coloring its own copy. the cache goes away with the formatter (a call, a compiled printer or a renderer)
+        self.box_cache = {}
+        if self.color:
+            enable_color()
+
+    def glyphs(self, text: str) -> str:
+        return text.translate(self.table) if self.table else text
+
+    def __getstate__(self) -> dict:
+        # process pools get a copy of the formatter without its pool or caches
+        state = self.__dict__.copy()
+        state['workers'] = state['cache'] = state['box_cache'] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.box_cache = {}
+
+    def __copy__(self) -> 'TreeFormatter':
+        # a copy in the same process keeps the pool and caches that pickling leaves out
+        formatter = object.__new__(type(self))
+        formatter.__dict__.update(self.__dict__)
+        return formatter
 
     def format(self, node: T) -> str:
+        return '\n'.join(self.iter_lines(node))
+
+    def iter_lines(self, node: T) -> Iterator[str]:
+        if self.on_stats and self.stats is None:
+            return self.profiled().iter_lines(node)
+        budget = self.make_budget()
+        with GcPause(self.pause_gc):
+            lines = self.layout(node, budget=budget).lines()
+        lines = strip_trailing_lines(lines)
+        if self.start_message:
+            lines = chain([self.start_message(node)], lines)
+        if budget is not None:
+            lines = budget.limit_lines(lines)
+        if self.stats is not None:
+            lines = self.stats.count_lines(lines)
+        return lines
+
+    def profiled(self) -> 'TreeFormatter':
+        # the timers aren't thread safe, so profiled renders don't use the pool
+        formatter = RenderStats(self.on_stats).instrument(self, PHASES)
+        formatter.workers = None
+        formatter.visit_node = formatter.stats.counted(formatter.visit_node)
+        return formatter
+
+    def make_budget(self) -> Budget:
+        if self.max_nodes == -1 and self.max_chars == -1 and self.timeout is None:
+            return None
+        return Budget(self.max_nodes, self.max_chars, self.timeout, self.on_truncate, self.truncated_message)
+
+    def write_to(self, stream: TextIO, node: T) -> None:
+        write_lines(stream, self.iter_lines(node))
+
+    def view(self, node: T) -> TreeView:
+        # the view finds a node by its box, so here every node gets a box of its own
+        formatter = copy.copy(self)
+        formatter.box_cache = None
+        boxes = {}
+        with GcPause(self.pause_gc):
+            return TreeView(formatter.layout(node, boxes=boxes, budget=formatter.make_budget()), boxes)
+
+    def tree_vertical_join(
+            self, node: T, depth: int = 0, boxes: dict = None, budget: Budget = None, ancestors: list[T] = None
+    ) -> Layout:
+        if self.compact:
+            return self.join_tree(
+                node, self.compact_children, add_parent_compact, to_compact_layout, self.top_seperator, False,
+                depth, boxes, budget, ancestors
+            )
+        return self.join_tree(
+            node, self.vertical_children, add_parent_top, to_layout_top, self.top_seperator, False,
+            depth, boxes, budget, ancestors
+        )
+
+    def tree_horizontal_join(
+            self, node: T, depth: int = 0, boxes: dict = None, budget: Budget = None, ancestors: list[T] = None
+    ) -> Layout:
+        return self.join_tree(
+            node, self.horizontal_children, add_parent_left, to_layout_left, self.left_seperator, True,
+            depth, boxes, budget, ancestors
+        )
+
+    def layout(
+            self, node: T, depth: int = 0, boxes: dict = None, budget: Budget = None, ancestors: list[T] = None
+    ) -> Layout:
         if self.orientation == Orientation.Vertical:
-            res = self.tree_vertical_join(node)
+            return self.tree_vertical_join(node, depth, boxes, budget, ancestors)
+        return self.tree_horizontal_join(node, depth, boxes, budget, ancestors)
+
+    def join_tree(
+            self,
+            root: T,
+            join_children: Callable[[list[Layout]], Layout],
+            parent_adder: Callable[[Layout, Layout], Layout],
+            to_layout: Callable[[NodeFormatter], Layout],
+            seperator: Layout,
+            pad_bottom: bool,
+            depth: int = 0,
+            boxes: dict = None,
+            budget: Budget = None,
+            ancestors: list[T] = None
+    ) -> Layout:
+        if self.stats is not None:
+            join_children = self.stats.timed('join', join_children)
+            parent_adder = self.stats.timed('join', parent_adder)
+            to_layout = self.stats.timed('join', to_layout)
+        cache = self.cache
+        if cache is None and self.share_subtrees and not self.shared_marker:
+            cache = LayoutCache(by_depth=self.max_depth != -1)
+        seen = {} if self.shared_marker else None
+        # what each node's callbacks returned, so a node that's reached again (a cycle, a marker or a node with two
+        # parents) doesn't call them again
+        memo = {}
+        # ids of the nodes being expanded, reaching one of them again from below is a cycle
+        path = {id(node) for node in ancestors} if ancestors else set()
+        # frames are [label, styled node, children iterator, joined children, depth, node to cache, node on the path]
+        # (the frame keeps the node on the path alive, so its id can't be reused by another node meanwhile)
+        if budget is not None:
+            budget.visit()
+        stack = [self.visit_node(root, depth, pad_bottom, cache, seen, path, memo, budget)]
+        if boxes is not None:
+            if stack[0][3] is not None:
+                boxes[id(root)] = (root, stack[0][1])
+        elif self.workers and depth == 0 and self.cache is None and seen is None and budget is None:
+            self.join_in_parallel(stack[0], root)
+        while True:
+            frame = stack[-1]
+            children = frame[2]
+            if children is not None:
+                child = next(children, _DONE)
+                if child is not _DONE:
+                    if budget is not None and not isinstance(child, MoreChildren) and not budget.visit():
+                        # out of budget, the rest of every open node's children become one '… more' box
+                        frame[2] = None
+                        child = MoreChildren()
+                    if self.cache is not None and frame[5] is not None and not isinstance(child, MoreChildren):
+                        self.cache.link(child, frame[5])
+                    if cache is not None and id(child) in path:
+                        # how a cycle is drawn depends on where it was entered, so the layouts around it aren't kept
+                        for open_frame in stack:
+                            open_frame[5] = None
+                    stack.append(self.visit_node(child, frame[4] + 1, pad_bottom, cache, seen, path, memo, budget))
+                    if boxes is not None and stack[-1][3] is not None and id(child) not in boxes:
+                        boxes[id(child)] = (child, stack[-1][1])
+                    continue
+            stack.pop()
+            label, node, _, joined, depth, cached_node, path_node = frame
+            if path_node is not None:
+                path.discard(id(path_node))
+            if joined is not None:
+                node = to_layout(node)
+                if joined:
+                    node = parent_adder(node, join_children(joined))
+                node = self.add_label(label, node, parent_adder, to_layout, seperator)
+                if cached_node is not None and (budget is None or budget.exceeded is None):
+                    cache.put(cached_node, depth, node)
+            if not stack:
+                return node
+            stack[-1][3].append(node)
+
+    def join_in_parallel(self, frame: list, root: T) -> None:
+        if frame[2] is None:
+            return
+        children = list(frame[2])
+        if len(children) < 2:
+            frame[2] = iter(children)
+            return
+        frame[2] = None
+        # imported here since concurrent.futures is slow to import and most trees don't use a pool
+        from concurrent.futures import Executor, ThreadPoolExecutor
+        if isinstance(self.workers, Executor):
+            # sending the root to a process pool would pickle the whole tree again for every subtree,
+            # so there a cycle through the root is only cut on its second visit
+            ancestors = [root] if isinstance(self.workers, ThreadPoolExecutor) else None
+            frame[3] = self.map_subtrees(self.workers, children, ancestors)
         else:
-            res = self.tree_horizontal_join(node)
-        res = res.to_str().rstrip()
-        if self.start_message:
-            return f'{ self.start_message(node) }\n{ res }'
-        return res
-
-    def tree_vertical_join(self, node: T, depth: int = 0) -> NodeFormatter:
-        label = self.get_label(node) if self.get_label else None
-        children = self.get_children(node)
-        node = self.add_styles(node)
-        if children and (self.max_depth == -1 or depth < self.max_depth):
-            children = [
-                self.tree_vertical_join(child, depth + 1)
-                for child in children
-            ]
-            if len(children) == 1:
-                children_node = children[0]
-                children_node.lines.insert(0, ' ' * children_node.get_middle_width() + '|')
-            else:
-                children_node = join_horizontally(children)
-            node = add_parent_top(node, children_node)
-        node = self.add_label(label, node, add_parent_top, '|')
-        return node
+            with ThreadPoolExecutor(min(self.workers, len(children))) as executor:
+                frame[3] = self.map_subtrees(executor, children, [root])
+
+    def map_subtrees(self, executor: 'Executor', children: list[T], ancestors: list[T] = None) -> list[Layout]:
+        futures = [executor.submit(self.layout, child, 1, None, None, ancestors) for child in children]
+        return [future.result() for future in futures]
 
-    def tree_horizontal_join(self, node: T, depth: int = 0) -> NodeFormatter:
-        label = self.get_label(node) if self.get_label else None
-        children = self.get_children(node)
-        node = self.add_styles(node)
-        node_padding = ' ' * node.width
-        node.lines = node.lines + [node_padding]
-        node.height += 1
-        if children and (self.max_depth == -1 or depth < self.max_depth):
-            children = [
-                self.tree_horizontal_join(child, depth + 1)
-                for child in children
-            ]
-            if len(children) == 1:
-                children_node = children[0]
-                middle = children_node.get_middle_height()
-                children_node.lines = [
-                    ('─' if i == middle else ' ') + line
-                    for i, line in enumerate(children_node.lines)
-                ]
+    def visit_node(
+            self,
+            node: T,
+            depth: int,
+            pad_bottom: bool,
+            cache: LayoutCache = None,
+            seen: dict = None,
+            path: set = None,
+            memo: dict = None,
+            budget: Budget = None
+    ) -> list:
+        marker = cached_node = None
+        if isinstance(node, MoreChildren):
+            return [None, self.add_styles(node, self.more_text(node), pad_bottom), None, [], depth, None, None]
+        entry = memo.get(id(node)) if memo is not None else None
+        if entry is None:
+            # [node, label, text, children], each filled in when it's first needed. the node is kept so its id
+            # can't be reused by another node during the render
+            entry = [node, _MISSING, _MISSING, _MISSING]
+            if memo is not None:
+                memo[id(node)] = entry
+        if path is not None and id(node) in path:
+            marker = self.cycle_text(node, self.node_text(entry))
+        elif seen is not None:
+            if id(node) in seen:
+                marker = str(self.shared_marker(node))
             else:
-                children_node = join_vertically(children)
-            node = add_parent_left(node, children_node)
-        node = self.add_label(label, node, add_parent_left, '─')
-        return node
+                seen[id(node)] = node
+        elif cache is not None:
+            layout = cache.get(node, depth)
+            if layout is not None:
+                return [None, layout, None, None, depth, None, None]
+            cache.unlink(node)
+            cached_node = node
+        label = entry[1]
+        if label is _MISSING:
+            label = entry[1] = self.get_label(node) if self.get_label else None
+        children = None
+        if marker is None and (self.max_depth == -1 or depth < self.max_depth):
+            children = entry[3]
+            if children is _MISSING:
+                children = entry[3] = replayable(self.get_children(node))
+            if isinstance(children, _TEE):
+                children = copy.copy(children)
+        original = node
+        node = self.add_styles(node, marker if marker is not None else self.node_text(entry), pad_bottom)
+        if children:
+            if path is None:
+                return [label, node, self.limit_children(children, budget), [], depth, cached_node, None]
+            path.add(id(original))
+            return [label, node, self.limit_children(children, budget), [], depth, cached_node, original]
+        return [label, node, None, [], depth, cached_node, None]
+
+    def more_text(self, node: MoreChildren) -> str:
+        return self.glyphs(str(node))
+
+    def node_text(self, entry: list) -> str:
+        if entry[2] is _MISSING:
+            entry[2] = str(self.get_node_val(entry[0]))
+        return entry[2]
+
+    def cycle_text(self, node: T, text: str = None) -> str:
+        if self.cycle_marker:
+            return str(self.cycle_marker(node))
+        return f'{self.cycle_symbol} {self.get_node_val(node) if text is None else text}'
+
+    @staticmethod
+    def pad_box(box: NodeFormatter, pad_bottom: bool) -> NodeFormatter:
+        if pad_bottom:
+            box.lines = box.lines + [' ' * box.width]
+            box.widths = box.get_widths() + [box.width]
+            box.height += 1
+        return box
+
+    def limit_children(self, children: Iterable[T], budget: Budget = None) -> Iterator[T]:
+        if self.max_children == -1:
+            return iter(children)
+        head_size = self.max_children - self.tail_children
+        if isinstance(children, Sequence):
+            count = len(children)
+            if count <= self.max_children:
+                return iter(children)
+            return chain(
+                children[:head_size],
+                [MoreChildren(count - self.max_children)],
+                children[count - self.tail_children:]
+            )
+        count = len(children) if hasattr(children, '__len__') else None
+        children = iter(children)
+        head = list(islice(children, head_size))
+        if self.tail_children:
+            # the tail is only known once everything was pulled, so the count is known too. an iterator that
+            # doesn't end within TAIL_SCAN_LIMIT more children may never end, so it's printed without a tail,
+            # and so is one that runs out the budget (the children that are skipped over count as nodes too)
+            tail = deque(islice(children, self.tail_children), maxlen=self.tail_children)
+            hidden = 0
+            for child in children:
+                if hidden == TAIL_SCAN_LIMIT or (budget is not None and not budget.visit()):
+                    return chain(head, [MoreChildren()])
+                tail.append(child)
+                hidden += 1
+            return chain(head, [MoreChildren(hidden)] if hidden else [], tail)
+        if next(children, _DONE) is _DONE:
+            return iter(head)
+        return chain(head, [MoreChildren(None if count is None else count - head_size)])
+
+    def vertical_children(self, children: [Layout]) -> Layout:
+        if len(children) == 1:
+            child = children[0]
+            pipe = NodeFormatter(['|'], height=1, width=1)
+            return Layout(
+                child.width, child.height + 1, child.middle,
+                [(max(child.middle, 0), 0, pipe), (0, 1, child)]
+            )
+        return join_horizontally(children, self.top_pipes)
+
+    def compact_children(self, children: [Layout]) -> Layout:
+        if len(children) == 1:
+            layout = self.vertical_children(children)
+            middle = max(children[0].middle, 0)
+            layout.contour = Contour([middle], [middle + 1], children[0].contour)
+            return layout
+        return join_compact(children, self.top_pipes)
+
+    def horizontal_children(self, children: [Layout]) -> Layout:
+        if len(children) == 1:
+            child = children[0]
+            pipe = NodeFormatter([self.left_pipes[-1]], height=1, width=1)
+            return Layout(
+                child.width + 1, child.height, child.middle,
+                [(0, child.middle, pipe), (1, 0, child)]
+            )
+        return join_vertically(children, self.left_pipes)
 
     def add_label(
             self,
             label: Any,
-            node: NodeFormatter,
-            parent_adder: Callable[[NodeFormatter, NodeFormatter], NodeFormatter],
-            seperator: str
-    ) -> NodeFormatter:
+            node: Layout,
+            parent_adder: Callable[[Layout, Layout], Layout],
+            to_layout: Callable[[NodeFormatter], Layout],
+            seperator: Layout
+    ) -> Layout:
         if label:
-            label = NodeFormatter.from_string(str(label))
-            if self.label_color:
-                label.color_bg(self.label_color, True)
-            node = parent_adder(NodeFormatter.from_string(seperator), node)
-            node = parent_adder(label, node)
+            label = self.make_box(str(label))
+            if self.label_style:
+                label.wrap(*self.label_style)
+            node = parent_adder(seperator, node)
+            node = parent_adder(to_layout(label), node)
         return node
 
-    def add_styles(self, node: NodeFormatter) -> NodeFormatter:
-        contents = str(self.get_node_val(node))
+    def add_styles(self, node: T, contents: str = None, pad_bottom: bool = False) -> NodeFormatter:
+        if contents is None:
+            contents = str(self.get_node_val(node))
+        if self.box_cache is None or len(contents) > BOX_CACHE_TEXT:
+            return self.style_box(contents, pad_bottom)
+        key = (contents, pad_bottom)
+        box = self.box_cache.get(key)
+        if box is None:
+            box = self.style_box(contents, pad_bottom)
+            if len(self.box_cache) >= BOX_CACHE_SIZE:
+                # starting over is far cheaper than tracking which boxes were used last, and the common ones are back
+                # after a few nodes
+                self.box_cache.clear()
+            self.box_cache[key] = box
+        return box
+
+    def style_box(self, contents: str, pad_bottom: bool = False) -> NodeFormatter:
+        if self.plain and '\x1b' in contents:
+            contents = strip_style(contents)
         if self.show_newline:
             contents = contents.replace('\n', self.newline_literal)
         if self.trim != -1:
             contents = trim_text(contents, self.trim, self.trim_symbol)
-        node = NodeFormatter.from_string(contents)
+        node = self.make_box(contents)
         if self.border:
-            node.add_border()
-        if self.color:
-            node.color_bg(self.color, add_space=not self.border)
+            node.add_border(self.border_glyphs)
+        if self.node_style:
+            node.wrap(*self.node_style)
+        if pad_bottom:
+            node = self.pad_box(node, True)
         return node
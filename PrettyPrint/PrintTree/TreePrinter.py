@@ -1,8 +1,23 @@
-from typing import Callable, Iterable, Any, TypeVar
-from colorama import Back
-from PrettyPrint.PrintTree.JsonTree import JsonTree
+from functools import partial
+from operator import attrgetter
+from os import PathLike
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Any, TextIO, TypeVar, Union
+from PrettyPrint.PrintTree.ArrayAdapter import ArrayTree
+from PrettyPrint.PrintTree.AsyncTree import fetch_tree, fetched_formatter, DEFAULT_CONCURRENCY
+from PrettyPrint.PrintTree.JsonAdapter import JsonKey, json_children, json_val
+from PrettyPrint.PrintTree.JsonStream import read_json
 from PrettyPrint.PrintTree.TreeFormatter import TreeFormatter
+from PrettyPrint.PrintTree.TreeView import TreeView
+from PrettyPrint.PrintTree.TreeRenderer import TreeRenderer, DEFAULT_CACHE_SIZE
+from PrettyPrint.Utils.Colors import DEFAULT_COLOR
+from PrettyPrint.Utils.CompiledPrinter import CompiledPrinter, DEFAULT_CHUNK_SIZE
+from PrettyPrint.Utils.LazyRender import LazyRender
 from PrettyPrint.Utils.Orientation import Orientation
+from PrettyPrint.Utils.RenderStats import RenderStats
+
+if TYPE_CHECKING:
+    import logging
+    from concurrent.futures import Executor
 
 
 T = TypeVar("T")
@@ -25,13 +40,28 @@ class PrettyPrintTree:
             trim: int = -1,
             trim_symbol: str = "...",
             start_message: Callable[[T], str] = None,
-            color: str = Back.LIGHTBLACK_EX,
+            color: str = DEFAULT_COLOR,
             border: bool = False,
             max_depth: int = -1,
             orientation: bool = Vertical,
+            share_subtrees: bool = False,
+            shared_marker: Callable[[T], Any] = None,
+            workers: Union[int, 'Executor'] = None,
+            max_children: int = -1,
+            tail_children: int = 0,
+            max_nodes: int = -1,
+            max_chars: int = -1,
+            timeout: float = None,
+            on_truncate: Callable[[str], Any] = None,
+            on_stats: Callable[[RenderStats], Any] = None,
+            cycle_marker: Callable[[T], Any] = None,
+            plain: bool = False,
+            ascii_only: bool = False,
+            compact: bool = False,
+            pause_gc: bool = False,
     ):
-        self.default_get_children = get_children or (lambda x: x.children)
-        self.default_get_node_val = get_val or (lambda x: x.value)
+        self.default_get_children = get_children or attrgetter('children')
+        self.default_get_node_val = get_val or attrgetter('value')
         self.default_get_label = get_label
         self.default_label_color = label_color
         self.default_trim = trim
@@ -44,6 +74,21 @@ class PrettyPrintTree:
         self.default_border = border
         self.default_max_depth = max_depth
         self.default_orientation = orientation
+        self.default_share_subtrees = share_subtrees
+        self.default_shared_marker = shared_marker
+        self.default_workers = workers
+        self.default_max_children = max_children
+        self.default_tail_children = tail_children
+        self.default_max_nodes = max_nodes
+        self.default_max_chars = max_chars
+        self.default_timeout = timeout
+        self.default_on_truncate = on_truncate
+        self.default_on_stats = on_stats
+        self.default_cycle_marker = cycle_marker
+        self.default_plain = plain
+        self.default_ascii_only = ascii_only
+        self.default_compact = compact
+        self.default_pause_gc = pause_gc
 
     def __call__(
             self,
@@ -63,8 +108,149 @@ class PrettyPrintTree:
             border: bool = None,
             max_depth: int = -1,
             orientation: bool = None,
+            share_subtrees: bool = None,
+            shared_marker: Callable[[T], Any] = None,
+            workers: Union[int, 'Executor'] = None,
+            max_children: int = -1,
+            tail_children: int = None,
+            max_nodes: int = -1,
+            max_chars: int = -1,
+            timeout: float = None,
+            on_truncate: Callable[[str], Any] = None,
+            on_stats: Callable[[RenderStats], Any] = None,
+            cycle_marker: Callable[[T], Any] = None,
+            plain: bool = None,
+            ascii_only: bool = None,
+            compact: bool = None,
+            pause_gc: bool = None,
     ):
-        tree_formatter = TreeFormatter(
+        res = self.make_formatter(
+            get_children=get_children,
+            get_val=get_val,
+            get_label=get_label,
+            label_color=label_color,
+            show_newline_literal=show_newline_literal,
+            newline_literal=newline_literal,
+            trim=trim,
+            trim_symbol=trim_symbol,
+            start_message=start_message,
+            color=color,
+            border=border,
+            max_depth=max_depth,
+            orientation=orientation,
+            share_subtrees=share_subtrees,
+            shared_marker=shared_marker,
+            workers=workers,
+            max_children=max_children,
+            tail_children=tail_children,
+            max_nodes=max_nodes,
+            max_chars=max_chars,
+            timeout=timeout,
+            on_truncate=on_truncate,
+            on_stats=on_stats,
+            cycle_marker=cycle_marker,
+            plain=plain,
+            ascii_only=ascii_only,
+            compact=compact,
+            pause_gc=pause_gc,
+        ).format(node)
+        if return_instead_of_print or (return_instead_of_print is None and self.default_dont_print):
+            return res
+        print(res)
+
+    async def arender(
+            self,
+            node: T,
+            *args,
+            concurrency: int = DEFAULT_CONCURRENCY,
+            return_instead_of_print: bool = None,
+            **kwargs
+    ):
+        formatter = self.make_formatter(*args, **kwargs)
+        res = fetched_formatter(formatter).format(await fetch_tree(node, formatter, concurrency))
+        if return_instead_of_print or (return_instead_of_print is None and self.default_dont_print):
+            return res
+        print(res)
+
+    def iter_lines(self, node: T, *args, **kwargs) -> Iterator[str]:
+        return self.make_formatter(*args, **kwargs).iter_lines(node)
+
+    def write_to(self, stream: TextIO, node: T, *args, **kwargs) -> None:
+        self.make_formatter(*args, **kwargs).write_to(stream, node)
+
+    def view(self, node: T, *args, **kwargs) -> TreeView:
+        return self.make_formatter(*args, **kwargs).view(node)
+
+    def renderer(
+            self,
+            *args,
+            cache_size: int = DEFAULT_CACHE_SIZE,
+            version: Callable[[T], Any] = None,
+            **kwargs
+    ) -> TreeRenderer:
+        return TreeRenderer(self.make_formatter(*args, **kwargs), cache_size, version)
+
+    def compile(self, *args, **kwargs) -> CompiledPrinter:
+        return CompiledPrinter(self.make_formatter(*args, **kwargs))
+
+    def render_all(
+            self,
+            roots: Iterable[T],
+            *args,
+            processes: Union[int, 'Executor'] = None,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            **kwargs
+    ) -> Iterator[str]:
+        return self.compile(*args, **kwargs).render_all(roots, processes, chunk_size)
+
+    def lazy(self, node: T, *args, **kwargs) -> LazyRender:
+        return LazyRender(partial(self, node, *args, return_instead_of_print=True, **kwargs))
+
+    def log_formatter(
+            self,
+            fmt: str = None,
+            datefmt: str = None,
+            style: str = '%',
+            attribute: str = 'tree',
+            **kwargs
+    ) -> 'logging.Formatter':
+        # imported here so importing PrettyPrint doesn't import logging
+        from PrettyPrint.Utils.TreeLogFormatter import TreeLogFormatter
+        return TreeLogFormatter(self.compile(**kwargs), fmt, datefmt, style, attribute)
+
+    def make_formatter(
+            self,
+            get_children: Callable[[T], Iterable[T]] = None,
+            get_val: Callable[[T], Any] = None,
+            get_label: Callable[[T], Any] = None,
+            *,
+            label_color: str = "",
+            show_newline_literal: bool = None,
+            newline_literal: str = None,
+            trim: int = -1,
+            trim_symbol: str = None,
+            start_message: Callable[[T], str] = None,
+            color: str = None,
+            border: bool = None,
+            max_depth: int = -1,
+            orientation: bool = None,
+            share_subtrees: bool = None,
+            shared_marker: Callable[[T], Any] = None,
+            workers: Union[int, 'Executor'] = None,
+            max_children: int = -1,
+            tail_children: int = None,
+            max_nodes: int = -1,
+            max_chars: int = -1,
+            timeout: float = None,
+            on_truncate: Callable[[str], Any] = None,
+            on_stats: Callable[[RenderStats], Any] = None,
+            cycle_marker: Callable[[T], Any] = None,
+            plain: bool = None,
+            ascii_only: bool = None,
+            compact: bool = None,
+            pause_gc: bool = None,
+    ) -> TreeFormatter:
+        return TreeFormatter(
             get_children=get_children or self.default_get_children,
             get_val=get_val or self.default_get_node_val,
             get_label=get_label or self.default_get_label,
@@ -78,11 +264,22 @@ class PrettyPrintTree:
             border=self.default_border if border is None else border,
             max_depth=max_depth if max_depth != -1 else self.default_max_depth,
             orientation=self.default_orientation if orientation is None else orientation,
+            share_subtrees=self.default_share_subtrees if share_subtrees is None else share_subtrees,
+            shared_marker=shared_marker or self.default_shared_marker,
+            workers=self.default_workers if workers is None else workers,
+            max_children=max_children if max_children != -1 else self.default_max_children,
+            tail_children=self.default_tail_children if tail_children is None else tail_children,
+            max_nodes=max_nodes if max_nodes != -1 else self.default_max_nodes,
+            max_chars=max_chars if max_chars != -1 else self.default_max_chars,
+            timeout=self.default_timeout if timeout is None else timeout,
+            on_truncate=on_truncate or self.default_on_truncate,
+            on_stats=on_stats or self.default_on_stats,
+            cycle_marker=cycle_marker or self.default_cycle_marker,
+            plain=self.default_plain if plain is None else plain,
+            ascii_only=self.default_ascii_only if ascii_only is None else ascii_only,
+            compact=self.default_compact if compact is None else compact,
+            pause_gc=self.default_pause_gc if pause_gc is None else pause_gc,
         )
-        res = tree_formatter.format(node)
-        if return_instead_of_print or (return_instead_of_print is None and self.default_dont_print):
-            return res
-        print(res)
 
     def print_json(
             self,
@@ -100,12 +297,27 @@ class PrettyPrintTree:
             border: bool = None,
             max_depth: int = -1,
             orientation: bool = None,
+            share_subtrees: bool = None,
+            shared_marker: Callable[[T], Any] = None,
+            workers: Union[int, 'Executor'] = None,
+            max_children: int = -1,
+            tail_children: int = None,
+            max_nodes: int = -1,
+            max_chars: int = -1,
+            timeout: float = None,
+            on_truncate: Callable[[str], Any] = None,
+            on_stats: Callable[[RenderStats], Any] = None,
+            cycle_marker: Callable[[T], Any] = None,
+            plain: bool = None,
+            ascii_only: bool = None,
+            compact: bool = None,
+            pause_gc: bool = None,
             name="JSON"
     ):
         return self(
-            node=JsonTree(name, dic),
-            get_children=lambda x: x.children if isinstance(x, JsonTree) else [],
-            get_val=lambda x: x.val if isinstance(x, JsonTree) else x,
+            node=JsonKey(name, dic),
+            get_children=json_children,
+            get_val=json_val,
             get_label=get_label,
             label_color=label_color,
             show_newline_literal=show_newline_literal,
@@ -118,4 +330,157 @@ class PrettyPrintTree:
             border=border,
             max_depth=max_depth,
             orientation=orientation,
+            share_subtrees=share_subtrees,
+            shared_marker=shared_marker,
+            workers=workers,
+            max_children=max_children,
+            tail_children=tail_children,
+            max_nodes=max_nodes,
+            max_chars=max_chars,
+            timeout=timeout,
+            on_truncate=on_truncate,
+            on_stats=on_stats,
+            cycle_marker=cycle_marker,
+            plain=plain,
+            ascii_only=ascii_only,
+            compact=compact,
+            pause_gc=pause_gc,
+        )
+
+    def print_array_tree(
+            self,
+            tree: ArrayTree,
+            get_label: Callable[[T], Any] = None,
+            *,
+            label_color: str = "",
+            show_newline_literal: bool = None,
+            newline_literal: str = None,
+            return_instead_of_print: bool = None,
+            trim: int = -1,
+            trim_symbol: str = None,
+            start_message: Callable[[T], str] = None,
+            color: str = None,
+            border: bool = None,
+            max_depth: int = -1,
+            orientation: bool = None,
+            share_subtrees: bool = None,
+            shared_marker: Callable[[T], Any] = None,
+            workers: Union[int, 'Executor'] = None,
+            max_children: int = -1,
+            tail_children: int = None,
+            max_nodes: int = -1,
+            max_chars: int = -1,
+            timeout: float = None,
+            on_truncate: Callable[[str], Any] = None,
+            on_stats: Callable[[RenderStats], Any] = None,
+            cycle_marker: Callable[[T], Any] = None,
+            plain: bool = None,
+            ascii_only: bool = None,
+            compact: bool = None,
+            pause_gc: bool = None,
+    ):
+        return self(
+            node=tree.root,
+            get_children=tree.children,
+            get_val=tree.value,
+            get_label=get_label or (tree.label if tree.labels is not None else None),
+            label_color=label_color,
+            show_newline_literal=show_newline_literal,
+            newline_literal=newline_literal,
+            return_instead_of_print=return_instead_of_print,
+            trim=trim,
+            trim_symbol=trim_symbol,
+            start_message=start_message,
+            color=color,
+            border=border,
+            max_depth=max_depth,
+            orientation=orientation,
+            share_subtrees=share_subtrees,
+            shared_marker=shared_marker,
+            workers=workers,
+            max_children=max_children,
+            tail_children=tail_children,
+            max_nodes=max_nodes,
+            max_chars=max_chars,
+            timeout=timeout,
+            on_truncate=on_truncate,
+            on_stats=on_stats,
+            cycle_marker=cycle_marker,
+            plain=plain,
+            ascii_only=ascii_only,
+            compact=compact,
+            pause_gc=pause_gc,
         )
+
+    def print_json_file(
+            self,
+            file: Union[str, PathLike, TextIO],
+            get_label: Callable[[T], Any] = None,
+            *,
+            label_color: str = "",
+            show_newline_literal: bool = None,
+            newline_literal: str = None,
+            return_instead_of_print: bool = None,
+            trim: int = -1,
+            trim_symbol: str = None,
+            start_message: Callable[[T], str] = None,
+            color: str = None,
+            border: bool = None,
+            max_depth: int = -1,
+            orientation: bool = None,
+            share_subtrees: bool = None,
+            shared_marker: Callable[[T], Any] = None,
+            workers: Union[int, 'Executor'] = None,
+            max_children: int = -1,
+            tail_children: int = None,
+            max_nodes: int = -1,
+            max_chars: int = -1,
+            timeout: float = None,
+            on_truncate: Callable[[str], Any] = None,
+            on_stats: Callable[[RenderStats], Any] = None,
+            cycle_marker: Callable[[T], Any] = None,
+            plain: bool = None,
+            ascii_only: bool = None,
+            compact: bool = None,
+            pause_gc: bool = None,
+            name="JSON"
+    ):
+        formatter = self.make_formatter(
+            get_children=json_children,
+            get_val=json_val,
+            get_label=get_label,
+            label_color=label_color,
+            show_newline_literal=show_newline_literal,
+            newline_literal=newline_literal,
+            trim=trim,
+            trim_symbol=trim_symbol,
+            start_message=start_message,
+            color=color,
+            border=border,
+            max_depth=max_depth,
+            orientation=orientation,
+            share_subtrees=share_subtrees,
+            shared_marker=shared_marker,
+            workers=workers,
+            max_children=max_children,
+            tail_children=tail_children,
+            max_nodes=max_nodes,
+            max_chars=max_chars,
+            timeout=timeout,
+            on_truncate=on_truncate,
+            on_stats=on_stats,
+            cycle_marker=cycle_marker,
+            plain=plain,
+            ascii_only=ascii_only,
+            compact=compact,
+            pause_gc=pause_gc,
+        )
+        if isinstance(file, (str, PathLike)):
+            with open(file, encoding='utf-8') as stream:
+                dic = read_json(stream, formatter.max_depth, formatter.max_children, formatter.tail_children)
+        else:
+            dic = read_json(file, formatter.max_depth, formatter.max_children, formatter.tail_children)
+        res = formatter.format(JsonKey(name, dic))
+        if return_instead_of_print or (return_instead_of_print is None and self.default_dont_print):
+            return res
+        print(res)
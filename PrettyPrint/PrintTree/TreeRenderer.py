@@ -0,0 +1,39 @@
+from typing import Callable, Iterator, Any, TextIO, TypeVar
+
+from PrettyPrint.PrintTree.TreeFormatter import TreeFormatter
+from PrettyPrint.Utils.LayoutCache import LayoutCache
+
+T = TypeVar("T")
+DEFAULT_CACHE_SIZE = 100_000
+
+
+class TreeRenderer:
+    def __init__(
+            self,
+            formatter: TreeFormatter,
+            cache_size: int = DEFAULT_CACHE_SIZE,
+            version: Callable[[T], Any] = None,
+    ):
+        if formatter.shared_marker:
+            raise ValueError("shared_marker can't be used with a renderer, its output depends on the visit order")
+        self.formatter = formatter
+        self.cache = formatter.cache = LayoutCache(cache_size, version, by_depth=formatter.max_depth != -1)
+
+    def __call__(self, node: T) -> str:
+        self.cache.new_render()
+        return self.formatter.format(node)
+
+    def iter_lines(self, node: T) -> Iterator[str]:
+        self.cache.new_render()
+        return self.formatter.iter_lines(node)
+
+    def write_to(self, stream: TextIO, node: T) -> None:
+        self.cache.new_render()
+        self.formatter.write_to(stream, node)
+
+    def changed(self, *nodes: T) -> None:
+        for node in nodes:
+            self.cache.invalidate(node)
+
+    def clear(self) -> None:
+        self.cache.clear()
@@ -0,0 +1,46 @@
+from typing import TypeVar
+
+from PrettyPrint.Utils.Layout import Layout
+from PrettyPrint.Utils.NodeFormatter import NodeFormatter
+from PrettyPrint.Utils.RowBuffer import RowBuffer
+
+T = TypeVar("T")
+
+
+# a laid out tree that can be drawn a window at a time, e.g. to scroll through a huge tree
+class TreeView:
+    def __init__(self, layout: Layout, boxes: dict):
+        self.layout = layout
+        self.extents = layout.extents()
+        self.width = self.extents.get(id(layout), layout.width)
+        self.height = layout.height
+        self.boxes = boxes
+        self.positions = None
+
+    def window(self, top: int, left: int, height: int, width: int) -> list[str]:
+        bottom, right = min(top + height, self.height), min(left + width, self.width)
+        top, left = max(top, 0), max(left, 0)
+        if bottom <= top or right <= left:
+            return []
+        buffer = RowBuffer(bottom - top)
+        self.layout.draw_window(buffer, top, left, bottom - top, right - left, self.extents)
+        buffer.pad(0, bottom - top, right - left)
+        return list(buffer.lines())
+
+    def locate(self, node: T) -> tuple[int, int, int, int]:
+        if id(node) not in self.boxes:
+            return None
+        if self.positions is None:
+            self.positions = {}
+            for x, y, box in self.layout.flatten().placements:
+                self.positions.setdefault(id(box), (y, x))
+        box: NodeFormatter = self.boxes[id(node)][1]
+        top, left = self.positions[id(box)]
+        return top, left, box.height, box.width
+
+    def around(self, node: T, radius: int) -> list[str]:
+        position = self.locate(node)
+        if position is None:
+            return []
+        top, left, height, width = position
+        return self.window(top - radius, left - radius, height + 2 * radius, width + 2 * radius)
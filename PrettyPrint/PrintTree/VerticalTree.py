@@ -1,64 +1,128 @@
+from operator import sub
+
+from PrettyPrint.Utils.Contour import Contour, take
+from PrettyPrint.Utils.Layout import Layout
 from PrettyPrint.Utils.NodeFormatter import NodeFormatter
-from PrettyPrint.Utils.StyleAwareUtils import ljust
-from PrettyPrint.Utils.ZipLongest import zip_longest
 
+PIPES = '┌─┬┐┴┼├┤'
+
+
+def to_layout(box: NodeFormatter) -> Layout:
+    return Layout.from_box(box, box.get_middle_width())
 
-def join_horizontally(boxes: [NodeFormatter]) -> NodeFormatter:
-    lines, width, height = join_boxes(boxes)
-    middle = add_pipes(boxes, lines)
+
+def join_horizontally(boxes: [Layout], pipes: str = PIPES) -> Layout:
+    placements, width, height = join_boxes(boxes)
+    pipes, middle = make_pipes(boxes, pipes)
+    placements.insert(0, (0, 0, pipes))
     height += 1
-    return NodeFormatter(lines, height=height, width=width, middle_width=middle)
-
-
-def join_boxes(boxes: [NodeFormatter]) -> ([str], int, int):
-    lines = [
-        ' '.join(
-            ljust(line, boxes[i].width)
-            for i, line in enumerate(lines)
-        )
-        for lines in zip_longest(*(box.lines for box in boxes), default='')
-    ]
-    width = sum(box.width for box in boxes) + len(boxes) - 1
+    return Layout(width, height, middle, placements, [(1, height, width, True)])
+
+
+def join_boxes(boxes: [Layout]) -> ([tuple], int, int):
+    placements = []
+    x = 0
+    for box in boxes:
+        placements.append((x, 1, box))
+        x += box.width + 1
     height = max(box.height for box in boxes)
-    return lines, width, height
+    return placements, x - 1, height
 
 
-def add_pipes(boxes: [NodeFormatter], lines: [str]) -> int:
-    padding = ' ' * boxes[0].get_middle_width()
-    pipes = '┌'
+def make_pipes(boxes: [Layout], glyphs: str = PIPES) -> (NodeFormatter, int):
+    # the pipes can be as wide as the whole tree, so they're built from the right characters instead of translated
+    start, line, tee, end, up, cross, start_up, _ = glyphs
+    padding = ' ' * boxes[0].middle
+    pipes = start
+    tees = set()
     for prev, box in zip(boxes, boxes[1:]):
-        pipes += '─' * (prev.width - prev.get_middle_width() + box.get_middle_width()) + '┬'
+        pipes += line * (prev.width - prev.middle + box.middle) + tee
+        tees.add(len(pipes) - 1)
     middle_of_pipes = sum(divmod(len(pipes), 2)) - 1
-    pipes = (
-            padding +
-            pipes[:middle_of_pipes]
-            + {"─": "┴", "┬": "┼", "┌": "├", "┐": "┤"}[pipes[middle_of_pipes]]
-            + pipes[middle_of_pipes + 1:-1]
-            + '┐'
-    )
-    lines.insert(0, pipes)
-    return len(padding) + middle_of_pipes
-
-
-def add_parent(parent: NodeFormatter, children: NodeFormatter) -> NodeFormatter:
-    parent_middle, children_middle = parent.get_middle_width(), children.get_middle_width()
-    parent_width, children_width = parent.width, children.width
-    if parent_middle == children_middle:
-        lines = parent.lines + children.lines
-        middle = parent_middle
-    elif parent_middle < children_middle:
-        padding = ' ' * (children_middle - parent_middle)
-        lines = [padding + line for line in parent.lines] + children.lines
-        parent_width += children_middle - parent_middle
-        middle = children_middle
+    # the pipe under the parent is the junction version of whichever pipe is there
+    if middle_of_pipes in tees:
+        joint = cross
     else:
-        padding = ' ' * (parent_middle - children_middle)
-        lines = parent.lines + [padding + line for line in children.lines]
-        children_width += parent_middle - children_middle
-        middle = parent_middle
-    return NodeFormatter(
-        lines,
-        height=parent.height + children.height,
-        width=max(parent_width, children_width),
-        middle_width=middle
+        joint = start_up if middle_of_pipes == 0 else up
+    pipes = padding + pipes[:middle_of_pipes] + joint + pipes[middle_of_pipes + 1:-1] + end
+    return NodeFormatter([pipes], height=1, width=len(pipes), widths=[len(pipes)]), len(padding) + middle_of_pipes
+
+
+def add_parent(parent: Layout, children: Layout) -> Layout:
+    parent_middle, children_middle = parent.middle, children.middle
+    parent_x = max(children_middle - parent_middle, 0)
+    children_x = max(parent_middle - children_middle, 0)
+    return Layout(
+        max(parent.width + parent_x, children.width + children_x),
+        parent.height + children.height,
+        max(parent_middle, children_middle),
+        [(parent_x, 0, parent), (children_x, parent.height, children)]
     )
+
+
+def to_compact_layout(box: NodeFormatter) -> Layout:
+    layout = to_layout(box)
+    layout.contour = Contour.box(box.width, box.height)
+    return layout
+
+
+def join_compact(boxes: [Layout], pipes: str = PIPES) -> Layout:
+    # like join_horizontally, but each subtree moves left until one of its rows would touch the subtrees before it,
+    # so they fill each other's empty space. only the rows both sides have are compared and the rest of the taller
+    # side is linked to instead of copied, so (like Reingold-Tilford's contours) the whole tree takes linear time
+    xs = [0]
+    contour, height = boxes[0].contour, boxes[0].height
+    left, right = 0, boxes[0].width
+    for box in boxes[1:]:
+        shared = min(height, box.height)
+        lefts, rights, rest = take((contour, 0, 0), shared)
+        box_lefts, box_rights, box_rest = take((box.contour, 0, 0), shared)
+        x = max(map(sub, rights, box_lefts)) + 1
+        rights = [box_right + x for box_right in box_rights]
+        if box.height > height:
+            box_contour, index, dx = box_rest
+            contour = Contour(lefts, rights, box_contour, index, dx + x)
+            height = box.height
+        elif box.height < height:
+            contour = Contour(lefts, rights, *rest)
+        else:
+            contour = Contour(lefts, rights)
+        xs.append(x)
+        left = min(left, x)
+        right = max(right, x + box.width)
+    # a subtree can reach further left than the first one, below it
+    xs = [x - left for x in xs]
+    pipes, first, middle = make_compact_pipes([x + max(box.middle, 0) for x, box in zip(xs, boxes)], pipes)
+    placements = [(first, 0, pipes)]
+    placements.extend((x, 1, box) for x, box in zip(xs, boxes))
+    height += 1
+    return Layout(
+        right - left, height, middle, placements, [(1, height, right - left, True)],
+        Contour([first], [first + pipes.width], contour, 0, -left)
+    )
+
+
+def make_compact_pipes(middles: [int], glyphs: str = PIPES) -> (NodeFormatter, int, int):
+    start, line, tee, end, up, cross, start_up, _ = glyphs
+    first = middles[0]
+    pipes = [line] * (middles[-1] - first + 1)
+    tees = {middle - first for middle in middles[1:-1]}
+    for position in tees:
+        pipes[position] = tee
+    pipes[0] = start
+    pipes[-1] = end
+    middle_of_pipes = sum(divmod(len(pipes), 2)) - 1
+    if middle_of_pipes in tees:
+        pipes[middle_of_pipes] = cross
+    else:
+        pipes[middle_of_pipes] = start_up if middle_of_pipes == 0 else up
+    pipes = ''.join(pipes)
+    return NodeFormatter([pipes], height=1, width=len(pipes), widths=[len(pipes)]), first, first + middle_of_pipes
+
+
+def add_parent_compact(parent: Layout, children: Layout) -> Layout:
+    layout = add_parent(parent, children)
+    (parent_x, _, _), (children_x, _, _) = layout.placements
+    lefts, rights, _ = take((parent.contour, 0, parent_x), parent.height)
+    layout.contour = Contour(lefts, rights, children.contour, 0, children_x)
+    return layout
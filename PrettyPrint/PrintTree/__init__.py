@@ -1 +1,2 @@
 from .TreePrinter import PrettyPrintTree
+from .ArrayAdapter import ArrayTree
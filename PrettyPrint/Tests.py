@@ -1,6 +1,23 @@
+import asyncio
+import gc
+import io
+import itertools
+import json
+import logging
+import sys
+import time
+import warnings
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 from colorama import Back
-from cmd2.ansi import style_aware_wcswidth as wcswidth
-from OldPrintTree import PrettyPrintTree
+
+# run as a script (python PrettyPrint/Tests.py) the package isn't on the path yet
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PrettyPrint import PrettyPrintTree, ArrayTree
+import PrettyPrint.Utils.Layout as layout_module
 
 
 class Tree:
@@ -56,20 +73,326 @@ PrettyPrintTree(lambda x: x.children, lambda x: x.val, lambda x: x.label, label_
 print()
 
 
-PrettyPrintTree(lambda x: x.children, lambda x: x.val, default_orientation=PrettyPrintTree.HORIZONTAL)(tree)
+PrettyPrintTree(lambda x: x.children, lambda x: x.val, orientation=PrettyPrintTree.Horizontal)(tree)
 print()
 PrettyPrintTree(lambda x: x.children, lambda x: x.val,
-                default_orientation=PrettyPrintTree.HORIZONTAL,
+                orientation=PrettyPrintTree.Horizontal,
                 show_newline_literal=True)(tree)
 print()
 PrettyPrintTree(lambda x: x.children, lambda x: x.val,
-                default_orientation=PrettyPrintTree.HORIZONTAL, border=True, max_depth=3)(tree)
+                orientation=PrettyPrintTree.Horizontal, border=True, max_depth=3)(tree)
 print()
 PrettyPrintTree(lambda x: x.children, lambda x: x.val, trim=5, color=Back.BLACK,
-                default_orientation=PrettyPrintTree.HORIZONTAL)(tree)
+                orientation=PrettyPrintTree.Horizontal)(tree)
 print()
 
 some_json = {'foo': 1, 'bar': (('a', 'a2'), 'b'), 'qux': {'foo': 1, 'arr': [{1: 2, 2: 1}], 'bar': ['a', 'b']}}
-PrettyPrintTree(color=Back.WHITE)(some_json)
+PrettyPrintTree(color=Back.WHITE).print_json(some_json)
 print()
 PrettyPrintTree().print_json(some_json, name="DICT", max_depth=3)
+
+
+# a tall tree is drawn a band of rows at a time, boxes cut by a band's edge come out the same
+tall = Tree("tall")
+for i in range(30):
+    tall.add_child(Tree(f"child {i}\nsecond line")).add_child(Tree(f"grandchild {i}"))
+tall_printer = PrettyPrintTree(
+    lambda x: x.children, lambda x: x.val, return_instead_of_print=True, orientation=PrettyPrintTree.Horizontal
+)
+tall_output = tall_printer(tall)
+default_band = layout_module.DRAW_BAND
+layout_module.DRAW_BAND = 7
+assert tall_printer(tall) == tall_output and list(tall_printer.iter_lines(tall)) == tall_output.split('\n')
+layout_module.DRAW_BAND = default_band
+
+
+# label callbacks written for the JsonTree nodes print_json used to make still work, and JsonTree is still there
+json_labels = PrettyPrintTree(return_instead_of_print=True, color='', label_color='').print_json(
+    {'a': {'b': 1}}, get_label=lambda x: f'{x.val}:{len(x.children)}' if hasattr(x, 'val') else None
+)
+assert 'JSON:1' in json_labels and 'a:1' in json_labels and 'b:1' in json_labels
+with warnings.catch_warnings(record=True) as caught:
+    warnings.simplefilter('always')
+    from PrettyPrint.PrintTree.JsonTree import JsonTree
+assert caught and caught[0].category is DeprecationWarning
+assert [child.val for child in JsonTree('JSON', {'a': 1, 'b': [2]}).children] == ['a', 'b']
+
+
+# print_json_file reads a long string in one pass (the time limit is far above it, and far below scanning it again
+# for every chunk) and takes the same literals json.load does
+json_text = json.dumps({'long': 'x' * 4_000_000 + '\\"', 'values': [float('nan'), float('inf'), float('-inf'), None]})
+start = time.perf_counter()
+from_file = PrettyPrintTree(return_instead_of_print=True, trim=10).print_json_file(io.StringIO(json_text))
+assert time.perf_counter() - start < 3
+assert from_file == PrettyPrintTree(return_instead_of_print=True, trim=10).print_json(json.loads(json_text))
+assert 'nan' in from_file and '-inf' in from_file
+
+
+# callbacks run once per node, even for a node with two parents. with workers each subtree of the head node is laid
+# out on its own, so there it's once per subtree
+calls = Counter()
+
+
+def counted_val(node):
+    calls[node.val] += 1
+    return node.val
+
+
+dag = Tree("root")
+shared = Tree("shared")
+shared.add_child(Tree("leaf"))
+dag.add_child(Tree("a")).add_child(shared)
+dag.add_child(Tree("b")).add_child(shared)
+dag_printer = PrettyPrintTree(lambda x: x.children, counted_val, return_instead_of_print=True)
+dag_output = dag_printer(dag)
+assert calls == Counter(root=1, a=1, b=1, shared=1, leaf=1)
+calls.clear()
+assert dag_printer(dag, workers=2) == dag_output
+assert calls == Counter(root=1, a=1, b=1, shared=2, leaf=2)
+
+
+# the garbage collector is only paused when asked for, and is back on once the render is done
+gc_states = []
+
+
+def gc_state_val(node):
+    gc_states.append(gc.isenabled())
+    return node.val
+
+
+PrettyPrintTree(lambda x: x.children, gc_state_val, return_instead_of_print=True)(tree)
+assert all(gc_states)
+gc_states.clear()
+PrettyPrintTree(lambda x: x.children, gc_state_val, return_instead_of_print=True, pause_gc=True)(tree)
+assert not any(gc_states) and gc.isenabled()
+
+
+# a None label in an ArrayTree means no label, like get_label returning None
+labeled_array = ArrayTree.from_parents([-1, 0, 0], labels=[None, 'x', ''])
+array_output = PrettyPrintTree(return_instead_of_print=True, color='').print_array_tree(labeled_array)
+assert 'None' not in array_output and 'x' in array_output
+
+
+# max_chars counts the '… truncated' message too, so the output is never longer than it
+full_output = PrettyPrintTree(lambda x: x.children, lambda x: x.val, return_instead_of_print=True)(tree)
+budget_printer = PrettyPrintTree(lambda x: x.children, lambda x: x.val, return_instead_of_print=True)
+assert budget_printer(tree, max_chars=len(full_output)) == full_output
+for limit in (0, 5, 11, 12, len(full_output) // 2, len(full_output) - 1):
+    assert len(budget_printer(tree, max_chars=limit)) <= limit
+assert budget_printer(tree, max_chars=5) == '… tru'
+
+
+# a timeout cuts the tree where the time ran out, the nodes that weren't reached become '… more' boxes
+truncated = []
+
+
+def slow_val(node):
+    time.sleep(0.02)
+    return node.val
+
+
+timed_output = PrettyPrintTree(lambda x: x.children, slow_val, return_instead_of_print=True)(
+    tree, timeout=0.05, on_truncate=truncated.append
+)
+assert truncated == ['timeout'] and '… more' in timed_output and 'wxyz' not in timed_output
+truncated.clear()
+PrettyPrintTree(lambda x: x.children, lambda x: x.val, return_instead_of_print=True)(
+    tree, max_nodes=3, on_truncate=truncated.append
+)
+assert truncated == ['max_nodes']
+
+
+# a node that leads back to one of its ancestors is drawn as a marker instead of being followed again
+looped = Tree("head")
+looped.add_child(Tree("child")).add_child(looped)
+looped_output = PrettyPrintTree(lambda x: x.children, lambda x: x.val, return_instead_of_print=True, color='')(
+    looped, cycle_marker=lambda node: f'back to {node.val}'
+)
+assert looped_output.split() == ['head', '|', 'child', '|', 'back', 'to', 'head']
+
+
+# a renderer lays out again only the nodes that changed and the path up to the root
+live = Tree("live")
+live_a = live.add_child(Tree("a"))
+live_b = live.add_child(Tree("b"))
+live_a_1 = live_a.add_child(Tree("a1"))
+live_a.add_child(Tree("a2"))
+live_b.add_child(Tree("b1"))
+calls.clear()
+live_printer = PrettyPrintTree(lambda x: x.children, counted_val, return_instead_of_print=True)
+live_renderer = live_printer.renderer()
+assert live_renderer(live) == live_printer(live)
+calls.clear()
+live_renderer(live)
+assert not calls
+live_a_1.val = "a1 changed"
+live_renderer.changed(live_a_1)
+calls.clear()
+live_output = live_renderer(live)
+assert calls == Counter({"live": 1, "a": 1, "a1 changed": 1})
+assert live_output == live_printer(live)
+# replacing subtrees again and again doesn't keep the replaced nodes around
+for frame in range(50):
+    live_b.children = [Tree(f"b{frame}")]
+    live_renderer.changed(live_b)
+    assert live_renderer(live) == live_printer(live)
+assert len(live_renderer.cache.parents) <= 5
+# with a version function only the node that changed needs a new version, its ancestors are laid out again too
+versions = Counter()
+versioned_renderer = live_printer.renderer(version=lambda x: versions[id(x)])
+versioned_renderer(live)
+live_a_1.val = "a1 changed again"
+versions[id(live_a_1)] += 1
+calls.clear()
+versioned_output = versioned_renderer(live)
+assert calls == Counter({"live": 1, "a": 1, "a1 changed again": 1})
+assert versioned_output == live_printer(live)
+calls.clear()
+versioned_renderer(live)
+assert not calls
+
+
+# arender awaits async callbacks, with at most concurrency of them running at once, and prints the same tree
+running = [0, 0]
+
+
+async def async_children(node):
+    running[0] += 1
+    running[1] = max(running)
+    await asyncio.sleep(0.001)
+    running[0] -= 1
+    return node.children
+
+
+async def async_gen_children(node):
+    for child in node.children:
+        yield child
+
+
+async def async_val(node):
+    return node.val
+
+
+sync_output = PrettyPrintTree(lambda x: x.children, lambda x: x.val, return_instead_of_print=True)(tree)
+async_printer = PrettyPrintTree(async_children, async_val, return_instead_of_print=True)
+assert asyncio.run(async_printer.arender(tree, concurrency=2)) == sync_output
+assert running[1] == 2
+assert asyncio.run(async_printer.arender(tree, async_gen_children)) == sync_output
+assert asyncio.run(async_printer.arender(tree, max_depth=2)) == PrettyPrintTree(
+    lambda x: x.children, lambda x: x.val, return_instead_of_print=True
+)(tree, max_depth=2)
+
+
+# with tail_children an iterator is read to its end, but one that doesn't end is printed without its tail
+def endless_children(node):
+    return (Tree(i) for i in itertools.count()) if node.val == "endless" else ()
+
+
+async def endless_async_children(node):
+    for i in itertools.count() if node.val == "endless" else ():
+        yield Tree(i)
+
+
+endless_printer = PrettyPrintTree(
+    endless_children, lambda x: x.val, return_instead_of_print=True, color="", max_children=3, tail_children=1
+)
+endless_output = endless_printer(Tree("endless"))
+assert endless_output.split()[-4:] == ['0', '1', '…', 'more']
+assert asyncio.run(endless_printer.arender(Tree("endless"), endless_async_children)) == endless_output
+
+
+# the children skipped over to find the tail count against the budget, so a timeout still stops the render
+def slow_endless_children(node):
+    for child in endless_children(node):
+        time.sleep(0.001)
+        yield child
+
+
+truncated.clear()
+start = time.monotonic()
+endless_output = endless_printer(Tree("endless"), slow_endless_children, timeout=0.05, on_truncate=truncated.append)
+assert time.monotonic() - start < 1 and truncated == ['timeout']
+assert endless_output.split() == ['endless', '|', '…', 'more']
+truncated.clear()
+endless_printer(
+    Tree("endless"), lambda x: (Tree(i) for i in range(1000)) if x.val == "endless" else (),
+    max_nodes=50, on_truncate=truncated.append
+)
+assert truncated == ['max_nodes']
+
+
+# a window of a view is the same part of the printed tree, and locate finds where a node was drawn.
+# the pipes over empty values stick out past their subtree, and the windows still show them
+empty_values = Tree("")
+empty_values.add_child(Tree(""))
+empty_values.add_child(Tree("x")).add_child(Tree(""))
+empty_values.add_child(Tree(""))
+for orientation in (PrettyPrintTree.Vertical, PrettyPrintTree.Horizontal):
+    view_printer = PrettyPrintTree(
+        lambda x: x.children, lambda x: x.val, return_instead_of_print=True, plain=True, orientation=orientation
+    )
+    for view_tree, step in ((tree, 7), (empty_values, 1)):
+        view = view_printer.view(view_tree)
+        full_rows = [row.ljust(view.width) for row in view_printer(view_tree).split('\n')]
+        assert all(len(row) == view.width for row in full_rows)
+        full_rows += [' ' * view.width] * (view.height - len(full_rows))
+        for top in range(-2, view.height, 3):
+            for left in range(-2, view.width, step):
+                window = view.window(top=top, left=left, height=4, width=10)
+                expected = [row[max(left, 0):left + 10] for row in full_rows[max(top, 0):top + 4]]
+                assert [row.rstrip() for row in window] == [row.rstrip() for row in expected]
+    view = view_printer.view(tree)
+    full_rows = [row.ljust(view.width) for row in view_printer(tree).split('\n')]
+    top, left, height, width = view.locate(child2_1)
+    assert full_rows[top][left:left + width].strip() == "an interesting story"
+    assert view.locate(Tree("not in the tree")) is None
+
+
+# print_json_file draws the same tree as print_json, also when the file is read in many chunks
+json_doc = {f'key {i}': [{'a': i, 'b': [i / 3, str(i) * 40, None]}, 'x\ny' * 20, {}] for i in range(500)}
+json_doc_text = json.dumps(json_doc, indent=2)
+assert len(json_doc_text) > 1 << 17
+json_printer = PrettyPrintTree(return_instead_of_print=True)
+for json_settings in ({}, {'max_depth': 2}, {'max_children': 4, 'tail_children': 2}, {'max_depth': 3, 'trim': 8}):
+    assert json_printer.print_json_file(io.StringIO(json_doc_text), **json_settings) == json_printer.print_json(
+        json_doc, **json_settings
+    )
+
+
+# a lazy tree is only printed when a handler formats the message, and only once however many handlers there are
+log_streams = [io.StringIO(), io.StringIO()]
+logger = logging.getLogger('PrettyPrint.Tests')
+logger.propagate = False
+for stream in log_streams:
+    logger.addHandler(logging.StreamHandler(stream))
+logger.setLevel(logging.INFO)
+log_printer = PrettyPrintTree(lambda x: x.children, counted_val, color='')
+calls.clear()
+logger.debug('tree:\n%s', log_printer.lazy(dag))
+assert not calls
+logger.info('tree:\n%s', log_printer.lazy(dag))
+assert calls == Counter(root=1, a=1, b=1, shared=1, leaf=1)
+dag_text = log_printer(dag, return_instead_of_print=True)
+assert all(stream.getvalue() == f'tree:\n{dag_text}\n' for stream in log_streams)
+# the log formatter prints the tree given in extra under the message
+log_stream = io.StringIO()
+log_handler = logging.StreamHandler(log_stream)
+log_handler.setFormatter(log_printer.log_formatter('%(levelname)s %(message)s'))
+logger.handlers = [log_handler]
+logger.info('state', extra={'tree': dag})
+logger.info('no tree')
+assert log_stream.getvalue() == f'INFO state\n{dag_text}\nINFO no tree\n'
+
+
+# the default getters (node.children and node.value) can be sent to a process pool
+class Node:
+    def __init__(self, value, children=()):
+        self.value = value
+        self.children = list(children)
+
+
+if __name__ == '__main__':
+    pooled_tree = Node(1, [Node(2, [Node(4)]), Node(3, [Node(5), Node(6)])])
+    with ProcessPoolExecutor(2) as pool:
+        pooled = PrettyPrintTree(return_instead_of_print=True)(pooled_tree, workers=pool)
+    assert pooled == PrettyPrintTree(return_instead_of_print=True)(pooled_tree)
@@ -0,0 +1,62 @@
+from collections import deque
+from time import monotonic
+from typing import Callable, Iterable, Iterator, Any
+
+TRUNCATED_MESSAGE = '… truncated'
+
+
+# the limits of a single render, exceeded is the name of the first limit that ran out
+class Budget:
+    def __init__(
+            self,
+            max_nodes: int = -1,
+            max_chars: int = -1,
+            timeout: float = None,
+            on_truncate: Callable[[str], Any] = None,
+            message: str = TRUNCATED_MESSAGE
+    ):
+        self.max_nodes = max_nodes
+        self.max_chars = max_chars
+        self.deadline = None if timeout is None else monotonic() + timeout
+        self.on_truncate = on_truncate
+        self.message = message
+        self.nodes = 0
+        self.exceeded = None
+
+    def visit(self) -> bool:
+        if self.exceeded:
+            return False
+        if self.max_nodes != -1 and self.nodes >= self.max_nodes:
+            return self.exceed('max_nodes')
+        if self.deadline is not None and monotonic() > self.deadline:
+            return self.exceed('timeout')
+        self.nodes += 1
+        return True
+
+    def exceed(self, name: str) -> bool:
+        if self.exceeded is None:
+            self.exceeded = name
+            if self.on_truncate:
+                self.on_truncate(name)
+        return False
+
+    def limit_lines(self, lines: Iterable[str]) -> Iterator[str]:
+        # only whole rows are written, so the diagram is cut at the bottom instead of getting ragged rows. a row is
+        # held back until the message would still fit after it, so the cut output isn't longer than max_chars either.
+        # the deadline isn't checked here, drawing only takes time in proportion to the nodes laid out in time
+        if self.max_chars == -1:
+            yield from lines
+            return
+        pending = deque()
+        chars = written = 0
+        for line in lines:
+            chars += len(line) + 1
+            if chars > self.max_chars + 1:
+                self.exceed('max_chars')
+                yield self.message[:self.max_chars - written]
+                return
+            pending.append(line)
+            while pending and written + len(pending[0]) + 1 + len(self.message) <= self.max_chars:
+                written += len(pending[0]) + 1
+                yield pending.popleft()
+        yield from pending
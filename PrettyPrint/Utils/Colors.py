@@ -0,0 +1,20 @@
+import os
+
+# the same codes as colorama.Back.LIGHTBLACK_EX and colorama.Style.RESET_ALL, so importing doesn't need colorama
+DEFAULT_COLOR = '\x1b[100m'
+RESET = '\x1b[0m'
+
+_color_enabled = False
+
+
+def enable_color() -> None:
+    global _color_enabled
+    if _color_enabled:
+        return
+    _color_enabled = True
+    if os.name == 'nt':
+        try:
+            from colorama import just_fix_windows_console
+        except ImportError:
+            return
+        just_fix_windows_console()
@@ -0,0 +1,62 @@
+from functools import partial
+from typing import TYPE_CHECKING, Iterable, Iterator, Any, TextIO, TypeVar, Union
+
+from PrettyPrint.Utils.LazyRender import LazyRender
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+T = TypeVar("T")
+DEFAULT_CHUNK_SIZE = 64
+
+
+# a printer whose settings were all resolved once, into one formatter. it can't be changed after it's made
+# and every render keeps its state to itself, so one can be shared between threads and called in a loop
+class CompiledPrinter:
+    __slots__ = ('formatter',)
+
+    def __init__(self, formatter: Any):
+        object.__setattr__(self, 'formatter', formatter)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"a {type(self).__name__} can't be changed, compile a new one instead")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"a {type(self).__name__} can't be changed, compile a new one instead")
+
+    def __call__(self, node: T) -> str:
+        return self.formatter.format(node)
+
+    def iter_lines(self, node: T) -> Iterator[str]:
+        return self.formatter.iter_lines(node)
+
+    def write_to(self, stream: TextIO, node: T) -> None:
+        self.formatter.write_to(stream, node)
+
+    def lazy(self, node: T) -> LazyRender:
+        return LazyRender(partial(self, node))
+
+    def render_all(
+            self,
+            roots: Iterable[T],
+            processes: Union[int, 'Executor'] = None,
+            chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[str]:
+        if processes is None:
+            return map(self.formatter.format, roots)
+        return render_in_pool(self.formatter, roots, processes, chunk_size)
+
+
+def render_in_pool(
+        formatter: Any,
+        roots: Iterable[T],
+        processes: Union[int, 'Executor'],
+        chunk_size: int
+) -> Iterator[str]:
+    # imported here since concurrent.futures is slow to import and most batches don't use a pool
+    from concurrent.futures import Executor, ProcessPoolExecutor
+    if isinstance(processes, Executor):
+        yield from processes.map(formatter.format, roots, chunksize=chunk_size)
+        return
+    with ProcessPoolExecutor(processes) as executor:
+        yield from executor.map(formatter.format, roots, chunksize=chunk_size)
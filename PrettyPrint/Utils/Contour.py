@@ -0,0 +1,42 @@
+# the left (first used) and right (one past the last used) column of every row of a layout, relative to its left
+# side, so subtrees can be packed into each other's empty space. a contour is its own first rows followed by the rows
+# of rest from row index on, shifted by dx. contours are never changed once made, so they can share their rows
+class Contour:
+    __slots__ = ('lefts', 'rights', 'rest', 'index', 'dx')
+
+    def __init__(self, lefts: list[int], rights: list[int], rest: 'Contour' = None, index: int = 0, dx: int = 0):
+        self.lefts = lefts
+        self.rights = rights
+        self.rest = rest
+        self.index = index
+        self.dx = dx
+
+    @classmethod
+    def box(cls, width: int, height: int) -> 'Contour':
+        return cls([0] * height, [width] * height)
+
+    def flat(self, height: int) -> 'Contour':
+        lefts, rights, _ = take((self, 0, 0), height)
+        return Contour(lefts, rights)
+
+
+def take(cursor: tuple, count: int) -> (list[int], list[int], tuple):
+    # the next count rows from cursor, which is (contour, row in its own rows, dx), and a cursor to the rows after them
+    contour, index, dx = cursor
+    lefts = []
+    rights = []
+    while count:
+        own = len(contour.lefts)
+        if index >= own:
+            contour, index, dx = contour.rest, contour.index, dx + contour.dx
+            continue
+        end = min(own, index + count)
+        if dx:
+            lefts.extend([left + dx for left in contour.lefts[index:end]])
+            rights.extend([right + dx for right in contour.rights[index:end]])
+        else:
+            lefts.extend(contour.lefts[index:end])
+            rights.extend(contour.rights[index:end])
+        count -= end - index
+        index = end
+    return lefts, rights, (contour, index, dx)
@@ -0,0 +1,33 @@
+import gc
+from threading import Lock
+
+_LOCK = Lock()
+
+
+# a layout (and the row buffer it is drawn into) is a lot of small objects that all stay alive, so the cyclic
+# collector would keep scanning them without finding any garbage (more than half the time on big trees).
+# the collector is global, so this is only done when asked for (pause_gc). renders in other threads can overlap,
+# so it's turned back on when the last of them ends, and only if it was on before the first one started
+class GcPause:
+    active = 0
+    was_enabled = False
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def __enter__(self) -> None:
+        if not self.enabled:
+            return
+        with _LOCK:
+            if GcPause.active == 0:
+                GcPause.was_enabled = gc.isenabled()
+                gc.disable()
+            GcPause.active += 1
+
+    def __exit__(self, *exc_info) -> None:
+        if not self.enabled:
+            return
+        with _LOCK:
+            GcPause.active -= 1
+            if GcPause.active == 0 and GcPause.was_enabled:
+                gc.enable()
@@ -0,0 +1,143 @@
+from typing import TYPE_CHECKING, Iterator
+
+from PrettyPrint.Utils.NodeFormatter import NodeFormatter
+from PrettyPrint.Utils.RowBuffer import RowBuffer
+from PrettyPrint.Utils.StyleAwareUtils import slice_columns
+
+if TYPE_CHECKING:
+    from PrettyPrint.Utils.Contour import Contour
+
+DRAW_BAND = 1024
+
+
+# A subtree positioned relative to its top left corner, nothing is drawn until the whole tree is laid out.
+# placements are (x, y, NodeFormatter | Layout) and pads are (first row, end row, width, covers nested pads).
+# compact layouts also know the contour of their rows
+class Layout:
+    __slots__ = ('width', 'height', 'middle', 'placements', 'pads', 'contour')
+
+    def __init__(
+            self,
+            width: int, height: int, middle: int,
+            placements: list[tuple], pads: list[tuple] = (), contour: 'Contour' = None
+    ):
+        self.width = width
+        self.height = height
+        self.middle = middle
+        self.placements = placements
+        self.pads = pads
+        self.contour = contour
+
+    @classmethod
+    def from_box(cls, box: NodeFormatter, middle: int):
+        return cls(box.width, box.height, middle, [(0, 0, box)])
+
+    def draw(self, buffer: RowBuffer, top: int = 0, bottom: int = None) -> None:
+        # draws the rows from top to bottom (all of them by default), the buffer's first row is top
+        if bottom is None:
+            bottom = self.height
+        stack = [(self, 0, 0, False)]
+        while stack:
+            item, x, y, covered = stack.pop()
+            if y >= bottom or y + item.height <= top:
+                continue
+            if isinstance(item, NodeFormatter):
+                if top <= y and y + item.height <= bottom:
+                    buffer.add(x, y - top, item.lines, item.get_widths())
+                else:
+                    first, last = max(top - y, 0), min(bottom - y, item.height)
+                    buffer.add(x, y + first - top, item.lines[first:last], item.get_widths()[first:last])
+                continue
+            for first, last, width, covers in item.pads:
+                if not covered:
+                    buffer.pad(max(y + first, top) - top, min(y + last, bottom) - top, x + width)
+                    covered = covers
+            for dx, dy, child in reversed(item.placements):
+                stack.append((child, x + dx, y + dy, covered))
+
+    def draw_window(
+            self, buffer: RowBuffer, top: int, left: int, height: int, width: int, extents: dict = None
+    ) -> None:
+        bottom, right = top + height, left + width
+        extents = extents or {}
+        stack = [(self, 0, 0, False)]
+        while stack:
+            item, x, y, covered = stack.pop()
+            if x >= right or y >= bottom or x + extents.get(id(item), item.width) <= left or y + item.height <= top:
+                continue
+            if isinstance(item, NodeFormatter):
+                widths = item.get_widths()
+                for row in range(max(top - y, 0), min(bottom - y, item.height)):
+                    start, end = max(left - x, 0), min(right - x, widths[row])
+                    if start < end:
+                        line = slice_columns(item.lines[row], start, end)
+                        buffer.add(x + start - left, y + row - top, [line], [end - start])
+                continue
+            for first, last, pad_width, covers in item.pads:
+                if not covered:
+                    buffer.pad(max(y + first, top) - top, min(y + last, bottom) - top, min(x + pad_width, right) - left)
+                    covered = covers
+            for dx, dy, child in reversed(item.placements):
+                stack.append((child, x + dx, y + dy, covered))
+
+    def extents(self) -> dict:
+        # id -> how far right a nested layout draws, for the ones that draw past their width
+        # (the pipes over children with empty values can stick out)
+        extents = {}
+        done = set()
+        stack = [(self, False)]
+        while stack:
+            item, expanded = stack.pop()
+            if id(item) in done:
+                continue
+            if not expanded:
+                stack.append((item, True))
+                stack.extend((child, False) for _, _, child in item.placements if isinstance(child, Layout))
+                continue
+            done.add(id(item))
+            right = item.width
+            for dx, _, child in item.placements:
+                right = max(right, dx + extents.get(id(child), child.width))
+            if right > item.width:
+                extents[id(item)] = right
+        return extents
+
+    def flatten(self) -> 'Layout':
+        placements = []
+        pads = []
+        stack = [(self, 0, 0, False)]
+        while stack:
+            item, x, y, covered = stack.pop()
+            if isinstance(item, NodeFormatter):
+                placements.append((x, y, item))
+                continue
+            for first, last, width, covers in item.pads:
+                if not covered:
+                    pads.append((y + first, y + last, x + width, False))
+                    covered = covers
+            for dx, dy, child in reversed(item.placements):
+                stack.append((child, x + dx, y + dy, covered))
+        return Layout(self.width, self.height, self.middle, placements, pads)
+
+    def __reduce__(self):
+        # nested layouts can be far deeper than pickle's recursion limit, so send them as one flat level
+        flat = self.flatten()
+        contour = self.contour.flat(self.height) if self.contour is not None else None
+        return Layout, (flat.width, flat.height, flat.middle, flat.placements, flat.pads, contour)
+
+    def lines(self) -> Iterator[str]:
+        # a layout that fits in one band is drawn right away, so it can be freed while its rows are read
+        if self.height <= DRAW_BAND:
+            buffer = RowBuffer(self.height)
+            self.draw(buffer)
+            return buffer.lines()
+        return self.band_lines()
+
+    def band_lines(self) -> Iterator[str]:
+        # drawn DRAW_BAND rows at a time, so only one band of rows is held at once. the layout itself is all built
+        # before the first row (where a node goes depends on the whole tree), so it still takes memory for every node
+        for top in range(0, self.height, DRAW_BAND):
+            bottom = min(top + DRAW_BAND, self.height)
+            buffer = RowBuffer(bottom - top)
+            self.draw(buffer, top, bottom)
+            yield from buffer.lines()
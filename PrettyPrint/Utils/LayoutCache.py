@@ -0,0 +1,127 @@
+from collections import OrderedDict
+from typing import Any, Callable, TypeVar
+
+from PrettyPrint.Utils.Layout import Layout
+
+T = TypeVar("T")
+
+
+class LayoutCache:
+    def __init__(self, max_size: int = None, version: Callable[[T], Any] = None, by_depth: bool = False):
+        self.max_size = max_size
+        self.version = version
+        self.by_depth = by_depth
+        # id(node) -> [node, version, {depth: layout}], least recently used first
+        self.layouts = OrderedDict()
+        # id(node) -> [node, {id(parent): parent}] and id(node) -> [node, {id(child): (child, version)}], from the last
+        # time each node was laid out (with the version each child was drawn at), so a change can be pushed up to every
+        # cached ancestor. the node is kept in its entry so its id can't be reused by another node meanwhile
+        self.parents = {}
+        self.children = {}
+        # id(node) -> (node, version) for this render, and the ids of the nodes whose subtree was already checked
+        self.versions = {}
+        self.checked = set()
+
+    def new_render(self) -> None:
+        self.versions.clear()
+        self.checked.clear()
+
+    def get(self, node: T, depth: int) -> Layout:
+        if self.version is not None and id(node) in self.layouts and id(node) not in self.checked:
+            self.check(node)
+        entry = self.layouts.get(id(node))
+        if entry is None:
+            return None
+        self.layouts.move_to_end(id(node))
+        return entry[2].get(depth if self.by_depth else 0)
+
+    def check(self, node: T) -> None:
+        # a cached layout draws the whole subtree, so every version below it is checked too (once per render).
+        # a node that changed takes the layouts of all its ancestors with it, the rest are kept
+        stack = [(node, None)]
+        while stack:
+            node, drawn = stack.pop()
+            version = self.current_version(node)
+            entry = self.layouts.get(id(node))
+            if (entry is not None and entry[1] != version) or (drawn is not None and drawn[0] != version):
+                self.invalidate(node)
+            if id(node) in self.checked:
+                continue
+            self.checked.add(id(node))
+            entry = self.children.get(id(node))
+            if entry is not None:
+                stack.extend((child, (version,)) for child, version in entry[1].values())
+
+    def current_version(self, node: T) -> Any:
+        entry = self.versions.get(id(node))
+        if entry is None:
+            entry = self.versions[id(node)] = (node, self.version(node))
+        return entry[1]
+
+    def put(self, node: T, depth: int, layout: Layout) -> None:
+        entry = self.layouts.get(id(node))
+        if entry is None:
+            entry = self.layouts[id(node)] = [node, self.current_version(node) if self.version else None, {}]
+            if self.max_size is not None and len(self.layouts) > self.max_size:
+                self.prune(self.layouts.popitem(last=False)[0])
+        entry[2][depth if self.by_depth else 0] = layout
+
+    def link(self, child: T, parent: T) -> None:
+        entry = self.parents.get(id(child))
+        if entry is None:
+            entry = self.parents[id(child)] = [child, {}]
+        entry[1][id(parent)] = parent
+        entry = self.children.get(id(parent))
+        if entry is None:
+            entry = self.children[id(parent)] = [parent, {}]
+        entry[1][id(child)] = (child, self.current_version(child) if self.version else None)
+
+    def unlink(self, node: T) -> None:
+        # the node is laid out again, so its children are linked again as they're reached
+        # (and the ones it doesn't have anymore aren't)
+        if id(node) not in self.layouts:
+            self.unlink_children(id(node))
+
+    def prune(self, node_id: int) -> None:
+        # once a node has no layout and no parent, no kept layout draws it, so neither do its links
+        if node_id not in self.parents:
+            self.unlink_children(node_id)
+
+    def unlink_children(self, node_id: int) -> None:
+        entry = self.children.pop(node_id, None)
+        stack = [entry] if entry is not None else []
+        while stack:
+            parent, children = stack.pop()
+            for child_id in children:
+                parents = self.parents[child_id][1]
+                del parents[id(parent)]
+                if not parents:
+                    del self.parents[child_id]
+                    if child_id not in self.layouts:
+                        entry = self.children.pop(child_id, None)
+                        if entry is not None:
+                            stack.append(entry)
+
+    def invalidate(self, node: T) -> None:
+        stack = [node]
+        done = set()
+        while stack:
+            node = stack.pop()
+            if id(node) in done:
+                continue
+            done.add(id(node))
+            self.layouts.pop(id(node), None)
+            entry = self.parents.get(id(node))
+            if entry is None:
+                self.prune(id(node))
+            else:
+                stack.extend(entry[1].values())
+
+    def clear(self) -> None:
+        self.new_render()
+        self.layouts.clear()
+        self.parents.clear()
+        self.children.clear()
+
+    def __len__(self) -> int:
+        return len(self.layouts)
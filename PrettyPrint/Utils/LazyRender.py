@@ -0,0 +1,18 @@
+from typing import Callable
+
+
+# a printed tree that is only printed once something turns it into a string, e.g. logging when (and if) a handler
+# formats the record. the text is kept, so every handler after the first gets it for free
+class LazyRender:
+    __slots__ = ('render', 'text')
+
+    def __init__(self, render: Callable[[], str]):
+        self.render = render
+        self.text = None
+
+    def __str__(self) -> str:
+        if self.text is None:
+            self.text = self.render()
+            # the node isn't needed anymore, and keeping it would keep the whole tree alive
+            self.render = None
+        return self.text
@@ -1,47 +1,75 @@
-import colorama.initialise
+from PrettyPrint.Utils.Colors import RESET
 from PrettyPrint.Utils.StyleAwareUtils import ljust, text_width
 
+BORDER = '│┌┐└┘─'
+
 
 class NodeFormatter:
     @classmethod
     def from_string(cls, content: str):
+        if '\n' not in content:
+            width = text_width(content)
+            return cls([content], height=1, width=width, widths=[width])
         lines = content.split('\n')
         height = len(lines)
-        width = max(text_width(line) for line in lines)
-        return cls(lines, height=height, width=width)
+        widths = [text_width(line) for line in lines]
+        return cls(lines, height=height, width=max(widths), widths=widths)
+
+    @classmethod
+    def from_plain_string(cls, content: str):
+        # for text without style codes, where an ascii check on the whole text lets every line be measured with len
+        if '\n' not in content and content.isascii():
+            return cls([content], height=1, width=len(content), widths=[len(content)])
+        lines = content.split('\n')
+        if content.isascii():
+            widths = [len(line) for line in lines]
+        else:
+            widths = [text_width(line) for line in lines]
+        return cls(lines, height=len(lines), width=max(widths), widths=widths)
 
     def __init__(
             self,
             lines: list[str], *, height: int, width: int,
-            middle_height: int = None, middle_width: int = None
+            middle_height: int = None, middle_width: int = None,
+            widths: list[int] = None
     ):
         self.lines = lines
         self.height = height
         self.width = width
         self.middle_height = middle_height
         self.middle_width = middle_width
+        self.widths = widths
 
-    def add_border(self) -> None:
+    def add_border(self, glyphs: str = BORDER) -> None:
+        widths = self.get_widths()
         if self.height == 1:
             self.width += 2
             self.lines[0] = f'[{ self.lines[0] }]'
+            widths[0] += 2
         else:
-            for i, line in enumerate(self.lines):
-                self.lines[i] = '│' + ljust(line, self.width) + '│'
-            self.lines.insert(0, '┌' + '─' * self.width + '┐')
-            self.lines.append('└' + '─' * self.width + '┘')
+            side, top_left, top_right, bottom_left, bottom_right, line = glyphs
+            for i, text in enumerate(self.lines):
+                self.lines[i] = side + ljust(text, self.width, width=widths[i]) + side
+            self.lines.insert(0, top_left + line * self.width + top_right)
+            self.lines.append(bottom_left + line * self.width + bottom_right)
             self.width += 2
             self.height += 2
+            self.widths = [self.width] * self.height
 
-    def color_bg(self, color: str, add_space: bool) -> None:
-        if add_space:
-            self.lines = [f'{ color } { ljust(line, self.width) } { colorama.Style.RESET_ALL }' for line in self.lines]
-            self.width += 2
-        else:
-            self.lines = [f'{ color }{ ljust(line, self.width) }{ colorama.Style.RESET_ALL }' for line in self.lines]
+    def wrap(self, prefix: str, suffix: str, padding: int) -> None:
+        widths = self.get_widths()
+        width = self.width
+        self.lines = [
+            prefix + (line if line_width == width else ljust(line, width, width=line_width)) + suffix
+            for line, line_width in zip(self.lines, widths)
+        ]
+        self.width += padding
+        self.widths = [self.width] * len(self.lines)
 
-    def to_str(self) -> str:
-        return '\n'.join(self.lines)
+    def get_widths(self) -> list[int]:
+        if self.widths is None:
+            self.widths = [text_width(line) for line in self.lines]
+        return self.widths
 
     def get_middle_width(self) -> int:
         if self.middle_width is None:
@@ -54,4 +82,8 @@ class NodeFormatter:
         return self.middle_height
 
 
-
+def style(color: str, add_space: bool) -> (str, str, int):
+    # what wrap puts around each line to color it, and how much wider that makes it
+    if add_space:
+        return f'{color} ', f' {RESET}', 2
+    return color, RESET, 0
@@ -0,0 +1,89 @@
+import copy
+from time import perf_counter
+from typing import Callable, Iterable, Iterator, Any
+
+
+# call counts and time per phase of a single render. times are exclusive, so time spent in get_val while
+# add_styles is running is only counted under get_val, and the phase times add up to the total
+class RenderStats:
+    def __init__(self, on_stats: Callable[['RenderStats'], Any] = None):
+        self.on_stats = on_stats
+        self.calls = {}
+        self.times = {}
+        self.nodes = 0
+        self.max_depth = 0
+        self.lines = 0
+        self.chars = 0
+        self.nested = 0.0
+
+    @property
+    def time(self) -> float:
+        return sum(self.times.values())
+
+    def timed(self, phase: str, func: Callable) -> Callable:
+        self.calls.setdefault(phase, 0)
+        self.times.setdefault(phase, 0.0)
+
+        def wrapper(*args, **kwargs):
+            outer = self.nested
+            self.nested = 0.0
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                self.calls[phase] += 1
+                self.times[phase] += elapsed - self.nested
+                self.nested = outer + elapsed
+        return wrapper
+
+    def counted(self, func: Callable) -> Callable:
+        def wrapper(node, depth=0, *args, **kwargs):
+            self.nodes += 1
+            if depth > self.max_depth:
+                self.max_depth = depth
+            return func(node, depth, *args, **kwargs)
+        return wrapper
+
+    def instrument(self, formatter: Any, phases: dict[str, str]) -> Any:
+        # a copy of the formatter whose callbacks (named by attribute) report to these stats
+        formatter = copy.copy(formatter)
+        formatter.stats = self
+        for attr, phase in phases.items():
+            func = getattr(formatter, attr)
+            if func:
+                setattr(formatter, attr, self.timed(phase, func))
+        return formatter
+
+    def count_lines(self, lines: Iterable[str]) -> Iterator[str]:
+        lines = iter(lines)
+        draw = self.timed('draw', next)
+        while True:
+            line = draw(lines, None)
+            if line is None:
+                break
+            self.lines += 1
+            self.chars += len(line) + 1
+            yield line
+        self.chars = max(self.chars - 1, 0)
+        if self.on_stats:
+            self.on_stats(self)
+
+    def as_dict(self) -> dict:
+        return {
+            'nodes': self.nodes,
+            'max_depth': self.max_depth,
+            'lines': self.lines,
+            'chars': self.chars,
+            'time': self.time,
+            'calls': dict(self.calls),
+            'times': dict(self.times),
+        }
+
+    def __str__(self) -> str:
+        rows = [
+            f'{self.nodes} nodes, depth {self.max_depth}, {self.lines} lines, {self.chars} chars in {self.time:.4f}s'
+        ]
+        for phase, elapsed in sorted(self.times.items(), key=lambda item: -item[1]):
+            rows.append(f'  {phase:<14}{self.calls[phase]:>9} calls {elapsed:>10.4f}s')
+        return '\n'.join(rows)
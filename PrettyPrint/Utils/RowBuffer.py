@@ -0,0 +1,36 @@
+from typing import Iterator
+
+
+class RowBuffer:
+    def __init__(self, height: int):
+        self.rows = [[] for _ in range(height)]
+        self.ends = [0] * height
+
+    def add(self, x: int, y: int, lines: [str], widths: [int]) -> None:
+        rows = self.rows
+        for i, line, width in zip(range(y, y + len(lines)), lines, widths):
+            rows[i].append((x, line, width))
+
+    def pad(self, start: int, end: int, width: int) -> None:
+        ends = self.ends
+        for i in range(start, end):
+            if ends[i] < width:
+                ends[i] = width
+
+    def render_row(self, y: int) -> str:
+        parts = []
+        cursor = 0
+        for x, text, width in self.rows[y]:
+            if x > cursor:
+                parts.append(' ' * (x - cursor))
+            parts.append(text)
+            cursor = x + width
+        if self.ends[y] > cursor:
+            parts.append(' ' * (self.ends[y] - cursor))
+        return ''.join(parts)
+
+    def lines(self) -> Iterator[str]:
+        rows = self.rows
+        for y in range(len(rows)):
+            yield self.render_row(y)
+            rows[y] = None
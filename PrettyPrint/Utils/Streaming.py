@@ -0,0 +1,35 @@
+from typing import Iterable, Iterator, TextIO
+
+WRITE_CHUNK_SIZE = 1 << 16
+
+
+def strip_trailing_lines(lines: Iterable[str]) -> Iterator[str]:
+    # streams the same lines as '\n'.join(lines).rstrip().split('\n')
+    pending = None
+    blank = []
+    for line in lines:
+        if not line or line.isspace():
+            blank.append(line)
+            continue
+        if pending is not None:
+            yield pending
+        yield from blank
+        blank = []
+        pending = line
+    yield '' if pending is None else pending.rstrip()
+
+
+def write_lines(stream: TextIO, lines: Iterable[str], chunk_size: int = WRITE_CHUNK_SIZE) -> None:
+    chunk = []
+    size = 0
+    for line in lines:
+        chunk.append(line)
+        size += len(line) + 1
+        if size >= chunk_size:
+            chunk.append('')
+            stream.write('\n'.join(chunk))
+            chunk = []
+            size = 0
+    if chunk:
+        chunk.append('')
+        stream.write('\n'.join(chunk))
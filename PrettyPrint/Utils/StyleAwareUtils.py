@@ -1,22 +1,182 @@
-from cmd2.ansi import style_aware_wcswidth as text_width
+import re
+from functools import lru_cache
+from typing import Iterator
+from unicodedata import category, east_asian_width
 
+ANSI_STYLE_RE = re.compile('\x1b\\[[^m]*m')
+WIDTH_CACHE_SIZE = 4096
+# the box drawing characters and their ascii replacements, all one column wide except '…',
+# so it's only applied to text that's measured afterwards
+ASCII_TABLE = str.maketrans({
+    '┌': '+', '┐': '+', '└': '+', '┘': '+', '┬': '+', '┴': '+', '├': '+', '┤': '+', '┼': '+',
+    '─': '-', '│': '|',
+    '↕': '|', '↓': 'v', '↑': '^', '↔': '-', '→': '>', '←': '<', '↺': '@',
+    '…': '...',
+})
 
-def ljust(text: str, amount: int, padding: str = ' ') -> str:
-    return text + padding * (amount - text_width(text))
 
+ZERO_WIDTH_JOINER = '\u200d'
+EMOJI_SELECTOR = '\ufe0f'
+# skin tones only change the emoji before them
+EMOJI_MODIFIERS = ('\U0001f3fb', '\U0001f3ff')
 
-def rjust(text: str, amount: int, padding: str = ' ') -> str:
-    return padding * (amount - text_width(text)) + text
+_wcwidth = None
+
+
+def strip_style(text: str) -> str:
+    return ANSI_STYLE_RE.sub('', text)
+
+
+def text_width(text: str) -> int:
+    if text.isascii() and text.isprintable():
+        return len(text)
+    return styled_text_width(text)
+
+
+@lru_cache(maxsize=WIDTH_CACHE_SIZE)
+def styled_text_width(text: str) -> int:
+    if '\x1b' in text:
+        text = strip_style(text)
+        if text.isascii() and text.isprintable():
+            return len(text)
+    width = 0
+    for _, char_size in iter_widths(text):
+        if char_size < 0:
+            return -1
+        width += char_size
+    return width
+
+
+def iter_widths(text: str) -> Iterator[tuple[str, int]]:
+    # splits the text into characters with their width, and style codes with a width of None.
+    # like wcwidth.wcswidth, whatever follows a zero width joiner is part of the emoji before it and
+    # the emoji selector can make the character before it wide. zero width characters stay with the one before them
+    # so a slice never splits an emoji
+    cluster = ''
+    width = 0
+    last = None
+    joined = False
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == '\x1b':
+            style = ANSI_STYLE_RE.match(text, i)
+            if style:
+                if cluster:
+                    yield cluster, width
+                    cluster = ''
+                yield style.group(), None
+                i = style.end()
+                continue
+        i += 1
+        if joined or char == ZERO_WIDTH_JOINER:
+            joined = not joined
+            cluster += char
+            continue
+        if char == EMOJI_SELECTOR and last:
+            width += selected_width(last)
+            last = None
+            cluster += char
+            continue
+        char_size = char_width(char)
+        if char_size == 0 and cluster:
+            cluster += char
+            continue
+        if cluster:
+            yield cluster, width
+        cluster, width = char, char_size
+        if char_size > 0:
+            last = char
+    if cluster:
+        yield cluster, width
+
+
+def load_wcwidth():
+    # imported the first time text that isn't plain ascii is measured, so importing PrettyPrint doesn't import it
+    global _wcwidth
+    if _wcwidth is None:
+        try:
+            import wcwidth
+        except ImportError:
+            wcwidth = False
+        _wcwidth = wcwidth
+    return _wcwidth
+
+
+@lru_cache(maxsize=WIDTH_CACHE_SIZE)
+def char_width(char: str) -> int:
+    wcwidth = load_wcwidth()
+    if wcwidth:
+        return wcwidth.wcwidth(char)
+    return unicode_char_width(char)
+
+
+@lru_cache(maxsize=WIDTH_CACHE_SIZE)
+def selected_width(char: str) -> int:
+    # how much wider the character gets when it's followed by the emoji selector
+    wcwidth = load_wcwidth()
+    if wcwidth:
+        return wcwidth.wcswidth(char + EMOJI_SELECTOR) - wcwidth.wcwidth(char)
+    return 0
+
+
+def unicode_char_width(char: str) -> int:
+    # close to wcwidth for most characters, but it doesn't know which emoji the selector makes wide
+    # and it's only as new as the unicodedata of this python
+    if char == '\0':
+        return 0
+    char_category = category(char)
+    if char_category == 'Cc':
+        return -1
+    if char == '\xad':
+        return 1
+    if (
+            char_category in ('Mn', 'Mc', 'Me', 'Cf', 'Zl', 'Zp')
+            or '\u1160' <= char <= '\u11ff' or EMOJI_MODIFIERS[0] <= char <= EMOJI_MODIFIERS[1]
+    ):
+        return 0
+    if char_category == 'Cn':
+        return 1
+    return 2 if east_asian_width(char) in ('W', 'F') else 1
+
+
+def ljust(text: str, amount: int, padding: str = ' ', width: int = None) -> str:
+    return text + padding * (amount - (text_width(text) if width is None else width))
+
+
+def rjust(text: str, amount: int, padding: str = ' ', width: int = None) -> str:
+    return padding * (amount - (text_width(text) if width is None else width)) + text
 
 
 def trim_text(text: str, length: int, symbol: str) -> str:
     flat_text = text.replace('\n', 'n')
-    contents_width = text_width(flat_text)
-    if contents_width <= length:
+    if text_width(flat_text) <= length:
         return text
-    text_slice = flat_text[:length]
-    i = 0
-    while text_width(text_slice) < length:
-        i += 1
-        text_slice = flat_text[:length + i]
-    return text[:length + i] + symbol
+    end = width = 0
+    for part, char_size in iter_widths(flat_text):
+        if end >= length and width >= length:
+            break
+        end += len(part)
+        if char_size is not None:
+            width += max(char_size, 0)
+    return text[:end] + symbol
+
+
+def slice_columns(text: str, start: int, end: int) -> str:
+    # keeps every style code so colors opened before start (or reset after end) still apply,
+    # and wide characters cut in half become spaces
+    if text.isascii() and text.isprintable():
+        return text[start:end]
+    parts = []
+    column = 0
+    for part, size in iter_widths(text):
+        if size is None:
+            parts.append(part)
+            continue
+        size = max(size, 0)
+        if start <= column and column + size <= end:
+            parts.append(part)
+        elif column < end and column + size > start:
+            parts.append(' ' * (min(column + size, end) - max(column, start)))
+        column += size
+    return ''.join(parts)
@@ -0,0 +1,31 @@
+import logging
+from typing import Callable, Any
+
+_MISSING = object()
+
+
+# a logging.Formatter that prints the node passed as extra={attribute: node} under the message.
+# the printed tree is kept on the record, so other handlers with the same formatter don't print it again
+class TreeLogFormatter(logging.Formatter):
+    def __init__(
+            self,
+            render: Callable[[Any], str],
+            fmt: str = None,
+            datefmt: str = None,
+            style: str = '%',
+            attribute: str = 'tree'
+    ):
+        super().__init__(fmt, datefmt, style)
+        self.render = render
+        self.attribute = attribute
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        message = super().formatMessage(record)
+        node = getattr(record, self.attribute, _MISSING)
+        if node is _MISSING:
+            return message
+        # keyed by id so the record can still be pickled (e.g. by a SocketHandler)
+        texts = record.__dict__.setdefault('rendered_trees', {})
+        if id(self.render) not in texts:
+            texts[id(self.render)] = self.render(node)
+        return f'{message}\n{texts[id(self.render)]}'
@@ -1,2 +1,2 @@
-from .PrintTree import PrettyPrintTree
+from .PrintTree import PrettyPrintTree, ArrayTree
 from .PrintLinkedList import PrettyPrintLinkedList
@@ -0,0 +1,54 @@
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from cases import benchmark_cases, build
+
+
+def measure(render, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        output = render()
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    render()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'seconds': min(times),
+        'peak_bytes': peak,
+        'output_chars': len(output),
+        'output_lines': output.count('\n') + 1,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Time PrettyPrintTree and PrettyPrintLinkedList on synthetic inputs')
+    parser.add_argument('-k', '--filter', default='', help='only run cases whose name contains this')
+    parser.add_argument('--scale', type=float, default=1, help='multiply every input size by this')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per case, the best one is reported')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    results = {}
+    print(f'{"case":<34}{"time (ms)":>12}{"peak (KiB)":>14}{"output (KiB)":>15}')
+    for name, case in benchmark_cases(args.scale).items():
+        if args.filter not in name:
+            continue
+        result = results[name] = measure(build(case), args.repeat)
+        print(
+            f'{name:<34}{result["seconds"] * 1000:>12.1f}'
+            f'{result["peak_bytes"] / 1024:>14.0f}{result["output_chars"] / 1024:>15.0f}'
+        )
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
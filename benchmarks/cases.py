@@ -0,0 +1,161 @@
+import io
+import json
+
+from shapes import TREE_SHAPES, binary_arrays, json_document, linked_list
+
+from PrettyPrint import PrettyPrintTree, PrettyPrintLinkedList, ArrayTree
+
+SMALL_TREE_PROCESSES = 4
+ORIENTATIONS = {'vertical': PrettyPrintTree.Vertical, 'horizontal': PrettyPrintTree.Horizontal}
+
+
+def tree_case(shape: str, n: int, values: str, orientation: str, **settings):
+    root = TREE_SHAPES[shape](n, values)
+    pt = PrettyPrintTree(
+        get_label=lambda x: x.label, return_instead_of_print=True,
+        orientation=ORIENTATIONS[orientation], **settings
+    )
+    return lambda: pt(root)
+
+
+def children(node):
+    return node.children
+
+
+def value(node):
+    return node.value
+
+
+def label(node):
+    return node.label
+
+
+def small_trees_case(count: int, orientation: str, mode: str = 'call', **settings):
+    # many small trees printed one after the other, like printing one on every request
+    # (a process pool pickles the callbacks, so these aren't lambdas)
+    roots = [TREE_SHAPES['random'](12, 'text', seed) for seed in range(count)]
+    pt = PrettyPrintTree(
+        children, value, label, return_instead_of_print=True,
+        orientation=ORIENTATIONS[orientation], **settings
+    )
+    if mode == 'compiled':
+        render = pt.compile()
+        return lambda: '\n'.join(render(root) for root in roots)
+    if mode == 'batch':
+        return lambda: '\n'.join(pt.render_all(roots))
+    if mode == 'batch-pool':
+        return lambda: '\n'.join(pt.render_all(roots, processes=SMALL_TREE_PROCESSES))
+    return lambda: '\n'.join(pt(root) for root in roots)
+
+
+def array_tree_case(n: int, values: str, orientation: str, **settings):
+    # building the ArrayTree is part of the case, like building the node objects is for the others
+    left, right, node_values = binary_arrays(n, values)
+    pt = PrettyPrintTree(return_instead_of_print=True, orientation=ORIENTATIONS[orientation], **settings)
+    return lambda: pt.print_array_tree(ArrayTree.from_children(left, right, node_values))
+
+
+def json_case(n: int, values: str, orientation: str, **settings):
+    document = json_document(n, values)
+    pt = PrettyPrintTree(return_instead_of_print=True, orientation=ORIENTATIONS[orientation], **settings)
+    return lambda: pt.print_json(document)
+
+
+def json_file_case(n: int, values: str, orientation: str, **settings):
+    # read from an in-memory file, so it's the streaming reader that's measured and not the disk
+    text = json.dumps(json_document(n, values), indent=1)
+    pt = PrettyPrintTree(return_instead_of_print=True, orientation=ORIENTATIONS[orientation], **settings)
+    return lambda: pt.print_json_file(io.StringIO(text))
+
+
+def linked_list_case(n: int, values: str, orientation: str, loop: bool = False, **settings):
+    head = linked_list(n, values, loop=loop)
+    pt = PrettyPrintLinkedList(
+        get_prev=lambda x: x.prev, return_instead_of_print=True,
+        orientation=ORIENTATIONS[orientation], **settings
+    )
+    return lambda: pt(head)
+
+
+def benchmark_cases(scale: float = 1) -> dict:
+    def size(n):
+        return max(int(n * scale), 2)
+
+    cases = {}
+    for orientation in ORIENTATIONS:
+        for shape, n in (('chain', 2000), ('fan_out', 5000), ('balanced', 20000), ('random', 20000)):
+            cases[f'tree/{shape}/{orientation}'] = (tree_case, shape, size(n), 'text', orientation)
+        for values in ('multiline', 'ansi', 'cjk', 'repeated'):
+            cases[f'tree/random-{values}/{orientation}'] = (tree_case, 'random', size(5000), values, orientation)
+        cases[f'tree/balanced-repeated/{orientation}'] = (tree_case, 'balanced', size(20000), 'repeated', orientation)
+        cases[f'tree/lopsided/{orientation}'] = (tree_case, 'lopsided', size(5000), 'text', orientation)
+        for mode, settings in (
+                ('plain', {'plain': True}),
+                ('ascii', {'plain': True, 'ascii_only': True}),
+                ('pause-gc', {'pause_gc': True}),
+        ):
+            cases[f'tree/balanced-{mode}/{orientation}'] = (
+                tree_case, 'balanced', size(20000), 'text', orientation, settings
+            )
+        for mode in ('call', 'compiled', 'batch', 'batch-pool'):
+            cases[f'tree/small-{mode}/{orientation}'] = (small_trees_case, size(2000), orientation, {'mode': mode})
+        cases[f'tree/array/{orientation}'] = (array_tree_case, size(20000), 'text', orientation)
+        cases[f'json/{orientation}'] = (json_case, size(20000), 'text', orientation)
+        cases[f'json-file/{orientation}'] = (json_file_case, size(20000), 'text', orientation)
+        cases[f'linked_list/{orientation}'] = (linked_list_case, size(1000), 'text', orientation)
+    # compact only changes vertical trees
+    for shape, n in (('lopsided', 5000), ('random', 20000)):
+        cases[f'tree/{shape}-compact/vertical'] = (tree_case, shape, size(n), 'text', 'vertical', {'compact': True})
+    return cases
+
+
+def golden_cases() -> dict:
+    cases = {}
+    for orientation in ORIENTATIONS:
+        for shape in ('chain', 'fan_out', 'balanced', 'random'):
+            cases[f'tree-{shape}-{orientation}'] = (tree_case, shape, 12, 'text', orientation)
+        for values in ('multiline', 'ansi', 'cjk', 'emoji'):
+            cases[f'tree-{values}-{orientation}'] = (tree_case, 'random', 15, values, orientation)
+        cases[f'tree-emoji-border-{orientation}'] = (tree_case, 'random', 15, 'emoji', orientation, {'border': True})
+        cases[f'tree-border-{orientation}'] = (tree_case, 'random', 15, 'multiline', orientation, {'border': True})
+        cases[f'tree-plain-{orientation}'] = (tree_case, 'random', 15, 'text', orientation, {'color': ''})
+        cases[f'tree-ascii-{orientation}'] = (
+            tree_case, 'random', 15, 'multiline', orientation, {'plain': True, 'ascii_only': True, 'border': True}
+        )
+        cases[f'tree-trim-{orientation}'] = (
+            tree_case, 'random', 15, 'multiline', orientation, {'trim': 6, 'show_newline_literal': True}
+        )
+        cases[f'tree-max-depth-{orientation}'] = (tree_case, 'balanced', 40, 'int', orientation, {'max_depth': 2})
+        cases[f'tree-max-children-{orientation}'] = (
+            tree_case, 'random', 40, 'int', orientation, {'max_children': 2, 'tail_children': 1}
+        )
+        cases[f'tree-max-children-head-{orientation}'] = (
+            tree_case, 'fan_out', 20, 'int', orientation, {'max_children': 5}
+        )
+        cases[f'tree-max-nodes-{orientation}'] = (tree_case, 'balanced', 40, 'int', orientation, {'max_nodes': 12})
+        cases[f'tree-max-chars-{orientation}'] = (tree_case, 'random', 15, 'multiline', orientation, {'max_chars': 300})
+        cases[f'tree-cycles-{orientation}'] = (tree_case, 'cyclic', 15, 'int', orientation)
+        cases[f'tree-cycles-max-depth-{orientation}'] = (
+            tree_case, 'cyclic', 15, 'int', orientation, {'max_depth': 5, 'share_subtrees': True}
+        )
+        cases[f'tree-array-{orientation}'] = (array_tree_case, 15, 'multiline', orientation)
+        cases[f'json-{orientation}'] = (json_case, 30, 'text', orientation)
+        cases[f'json-file-{orientation}'] = (
+            json_file_case, 60, 'multiline', orientation, {'max_depth': 3, 'max_children': 3, 'tail_children': 1}
+        )
+        # the top level is full after three items, so the rest of the file isn't read
+        cases[f'json-file-head-{orientation}'] = (json_file_case, 60, 'int', orientation, {'max_children': 3})
+        cases[f'linked-list-{orientation}'] = (linked_list_case, 6, 'multiline', orientation)
+        cases[f'linked-list-ring-{orientation}'] = (linked_list_case, 5, 'int', orientation, {'loop': True})
+        cases[f'linked-list-max-nodes-{orientation}'] = (linked_list_case, 6, 'int', orientation, {'max_nodes': 3})
+    cases['tree-compact-vertical'] = (tree_case, 'lopsided', 40, 'text', 'vertical', {'compact': True})
+    cases['tree-compact-multiline-vertical'] = (
+        tree_case, 'random', 15, 'multiline', 'vertical', {'compact': True, 'border': True}
+    )
+    return cases
+
+
+def build(case: tuple):
+    factory, *args = case
+    settings = args.pop() if isinstance(args[-1], dict) else {}
+    return factory(*args, **settings)
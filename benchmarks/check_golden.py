@@ -0,0 +1,39 @@
+import argparse
+import difflib
+import sys
+from pathlib import Path
+
+from cases import golden_cases, build
+
+GOLDEN_DIR = Path(__file__).resolve().parent / 'golden'
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Compare renderings against the stored golden outputs')
+    parser.add_argument('--update', action='store_true', help='rewrite the golden files from the current code')
+    args = parser.parse_args()
+
+    failed = []
+    for name, case in golden_cases().items():
+        output = build(case)()
+        path = GOLDEN_DIR / f'{name}.txt'
+        if args.update:
+            GOLDEN_DIR.mkdir(exist_ok=True)
+            path.write_bytes(output.encode('utf-8'))
+            continue
+        expected = path.read_bytes().decode('utf-8') if path.exists() else ''
+        if output != expected:
+            failed.append(name)
+            sys.stdout.writelines(difflib.unified_diff(
+                expected.splitlines(True), output.splitlines(True), f'golden/{name}.txt', 'current'
+            ))
+            print()
+    if args.update:
+        print(f'updated {len(golden_cases())} golden files')
+        return 0
+    print(f'{len(golden_cases()) - len(failed)} passed, {len(failed)} failed')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,49 @@
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BUDGET_MS = 50
+RUNS = 5
+HEAVY_MODULES = ('cmd2', 'colorama', 'wcwidth')
+
+
+def import_time_us() -> int:
+    res = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import PrettyPrint'],
+        capture_output=True, text=True, check=True, cwd=ROOT,
+        env={**os.environ, 'PYTHONPATH': str(ROOT)},
+    )
+    for line in res.stderr.splitlines():
+        if line.endswith('| PrettyPrint'):
+            return int(line.split('|')[1])
+    raise RuntimeError('PrettyPrint missing from -X importtime output')
+
+
+def loaded_heavy_modules() -> [str]:
+    res = subprocess.run(
+        [sys.executable, '-c', f'import sys, PrettyPrint; print(*(m for m in {HEAVY_MODULES!r} if m in sys.modules))'],
+        capture_output=True, text=True, check=True, cwd=ROOT,
+        env={**os.environ, 'PYTHONPATH': str(ROOT)},
+    )
+    return res.stdout.split()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Check that "import PrettyPrint" stays within its time budget')
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS)
+    parser.add_argument('--runs', type=int, default=RUNS)
+    args = parser.parse_args()
+
+    best = min(import_time_us() for _ in range(args.runs)) / 1000
+    heavy = loaded_heavy_modules()
+    print(f'import PrettyPrint: {best:.1f} ms (budget {args.budget_ms:g} ms, best of {args.runs})')
+    if heavy:
+        print(f'eagerly imported: {", ".join(heavy)}')
+    return 0 if best <= args.budget_ms and not heavy else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,158 @@
+import random
+from array import array
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# emoji sequences and combining marks, each one narrower than its characters
+EMOJI = ('👍🏽', '👨\u200d👩\u200d👧', '☃\ufe0f', 'cafe\u0301', 'क्षि', 'aः')
+VALUES = {
+    'int': lambda i: i,
+    'text': lambda i: f'node {i}',
+    'multiline': lambda i: f'node {i}\nline two\n{"x" * (i % 7)}',
+    'ansi': lambda i: f'\x1b[31mnode\x1b[39m {i}',
+    'cjk': lambda i: f'節点{i}',
+    'emoji': lambda i: f'{EMOJI[i % len(EMOJI)]} {i}',
+    # a handful of values over and over, like None, 0 and enum names in a real dump
+    'repeated': lambda i: ('None', 0, 'True', 'name', 'Color.RED', -1, 'id')[i % 7],
+}
+
+
+class Tree:
+    __slots__ = ('value', 'children', 'label')
+
+    def __init__(self, value, label=None):
+        self.value = value
+        self.children = []
+        self.label = label
+
+
+class ListNode:
+    __slots__ = ('value', 'next', 'prev')
+
+    def __init__(self, value):
+        self.value = value
+        self.next = None
+        self.prev = None
+
+
+def chain(n: int, values: str = 'int') -> Tree:
+    value = VALUES[values]
+    root = node = Tree(value(0))
+    for i in range(1, n):
+        child = Tree(value(i))
+        node.children.append(child)
+        node = child
+    return root
+
+
+def fan_out(n: int, values: str = 'int') -> Tree:
+    value = VALUES[values]
+    root = Tree(value(0))
+    root.children = [Tree(value(i)) for i in range(1, n)]
+    return root
+
+
+def balanced(n: int, values: str = 'int', branching: int = 3) -> Tree:
+    value = VALUES[values]
+    nodes = [Tree(value(0))]
+    for i in range(1, n):
+        child = Tree(value(i))
+        nodes[(i - 1) // branching].children.append(child)
+        nodes.append(child)
+    return nodes[0]
+
+
+def random_tree(n: int, values: str = 'int', seed: int = 0) -> Tree:
+    value = VALUES[values]
+    rng = random.Random(seed)
+    nodes = [Tree(value(0))]
+    for i in range(1, n):
+        child = Tree(value(i), label=f'{i}%' if rng.random() < 0.2 else None)
+        nodes[int(len(nodes) * rng.random() ** 0.5)].children.append(child)
+        nodes.append(child)
+    return nodes[0]
+
+
+def lopsided(n: int, values: str = 'int', seed: int = 0) -> Tree:
+    # most nodes hang off one of the last few, so a few long narrow branches grow next to short ones, like an AST
+    value = VALUES[values]
+    rng = random.Random(seed)
+    nodes = [Tree(value(0))]
+    for i in range(1, n):
+        child = Tree(value(i))
+        nodes[max(len(nodes) - 1 - int(rng.expovariate(0.3)), 0)].children.append(child)
+        nodes.append(child)
+    return nodes[0]
+
+
+def with_cycles(n: int, values: str = 'int', seed: int = 0) -> Tree:
+    # a random tree where every fifth node also leads back to one of its ancestors
+    root = random_tree(n, values, seed)
+    rng = random.Random(seed)
+    stack = [(root, ())]
+    i = 0
+    while stack:
+        node, ancestors = stack.pop()
+        ancestors += (node,)
+        children = list(node.children)
+        i += 1
+        if i % 5 == 0:
+            node.children.append(rng.choice(ancestors))
+        stack.extend((child, ancestors) for child in reversed(children))
+    return root
+
+
+def binary_arrays(n: int, values: str = 'int') -> (array, array, list):
+    # a full binary tree as scikit-learn stores one: children_left, children_right (-1 for none) and values
+    value = VALUES[values]
+    left, right = array('q', [-1]) * n, array('q', [-1]) * n
+    for node in range((n - 1) // 2):
+        left[node], right[node] = 2 * node + 1, 2 * node + 2
+    return left, right, [value(i) for i in range(n)]
+
+
+def json_document(n: int, values: str = 'int', seed: int = 0):
+    value = VALUES[values]
+    rng = random.Random(seed)
+    root = {}
+    containers = [root]
+    for i in range(n):
+        parent = containers[int(len(containers) * rng.random() ** 0.5)]
+        roll = rng.random()
+        item = {} if roll < 0.15 else [] if roll < 0.25 else value(i)
+        if isinstance(parent, dict):
+            parent[f'key{i}'] = item
+        else:
+            parent.append(item)
+        if isinstance(item, (dict, list)):
+            containers.append(item)
+    return root
+
+
+def linked_list(n: int, values: str = 'int', doubly: bool = True, loop: bool = False) -> ListNode:
+    value = VALUES[values]
+    head = node = ListNode(value(0))
+    for i in range(1, n):
+        nxt = ListNode(value(i))
+        node.next = nxt
+        if doubly:
+            nxt.prev = node
+        node = nxt
+    if loop:
+        # the last node leads back to the head, like a ring buffer
+        node.next = head
+        if doubly:
+            head.prev = node
+    return head
+
+
+TREE_SHAPES = {
+    'chain': chain,
+    'fan_out': fan_out,
+    'balanced': balanced,
+    'random': random_tree,
+    'lopsided': lopsided,
+    'cyclic': with_cycles,
+}
@@ -19,6 +19,6 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     install_requires=[
-        "colorama", "cmd2"
+        "colorama", "wcwidth"
     ],
 )